@@ -9,11 +9,10 @@ def duplication_mapper():
     """Duplication mapper implementation.
     """
     instance = Instance()
+    out_ports = instance.list_ports()[Operator.O_F]
 
     while instance.reuse_instance():
         # o_f
-        out_ports = instance.list_ports()[Operator.O_F]
-
         message = Message(0.0, data='testing')
         for out_port in out_ports:
             instance.send(out_port, message)
@@ -1,5 +1,3 @@
-import multiprocessing as mp
-
 import ymmsl
 
 from libmuscle.logging import LogLevel, LogMessage, Timestamp
@@ -34,30 +32,30 @@ def do_logging_test(caplog):
     # create server
     ymmsl_doc = ymmsl.load(ymmsl_text)
     manager = Manager(ymmsl_doc)
-
-    # create client
-    client = MMPClient(manager.get_server_location())
-    message = LogMessage(
-            instance_id='test_logging',
-            timestamp=Timestamp(2.0),
-            level=LogLevel.DEBUG,
-            text='Integration testing')
-
-    # log and check
-    client.submit_log_message(message)
-    for rec in caplog.records:
-        if rec.name == 'instances.test_logging':
-            assert rec.time_stamp == '1970-01-01T00:00:02Z'
-            assert rec.levelname == 'DEBUG'
-            assert rec.message == 'Integration testing'
-            break
-
-    client.close()
-    manager.stop()
+    try:
+        # create client
+        client = MMPClient(manager.get_server_location())
+        message = LogMessage(
+                instance_id='test_logging',
+                timestamp=Timestamp(2.0),
+                level=LogLevel.DEBUG,
+                text='Integration testing')
+
+        # log and check
+        client.submit_log_message(message)
+        for rec in caplog.records:
+            if rec.name == 'test_logging':
+                assert rec.iasctime == '1970-01-01 00:00:02,000'
+                assert rec.levelname == 'DEBUG'
+                assert rec.message == 'Integration testing'
+                break
+        else:
+            assert False, 'Log message was not received by the manager'
+
+        client.close()
+    finally:
+        manager.stop()
 
 
 def test_logging(log_file_in_tmpdir, caplog):
-    process = mp.Process(target=do_logging_test, args=(caplog,))
-    process.start()
-    process.join()
-    assert process.exitcode == 0
+    do_logging_test(caplog)
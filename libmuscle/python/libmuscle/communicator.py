@@ -1,17 +1,21 @@
+from concurrent.futures import Future, ThreadPoolExecutor
 import logging
+from time import time
 from typing import Any, Dict, List, Optional, Tuple, cast
 from ymmsl import Conduit, Identifier, Operator, Reference, Settings
 
 from libmuscle.endpoint import Endpoint
 from libmuscle.mpp_message import ClosePort, MPPMessage
 from libmuscle.mpp_client import MPPClient
-from libmuscle.mcp.transport_server import TransportServer
+from libmuscle.mcp.transport_server import (
+        ServerNotSupported, TransportServer)
 from libmuscle.mcp.type_registry import transport_server_types
 from libmuscle.peer_manager import PeerManager
 from libmuscle.post_office import PostOffice
 from libmuscle.port import Port
 from libmuscle.profiler import Profiler
 from libmuscle.profiling import ProfileEventType
+from libmuscle.timestamp import Timestamp
 
 
 _logger = logging.getLogger(__name__)
@@ -20,6 +24,16 @@ _logger = logging.getLogger(__name__)
 MessageObject = Any
 
 
+# Maximum number of messages to fetch concurrently, see ireceive_message
+_MAX_RECEIVE_THREADS = 16
+
+
+# Types of message data that cannot change after being sent, so that their
+# encoded form can be reused if the same object is sent again. ClosePort is
+# here because close_ports() sends the same one on many ports.
+_REUSABLE_DATA_TYPES = (str, bytes, ClosePort)
+
+
 class Message:
     """A message to be sent or received.
 
@@ -36,6 +50,11 @@ class Message:
     """
     # Note: This is for communication with the user, it's not what
     # actually goes out on the wire, see libmuscle.mcp.Message for that.
+
+    # One or more of these is made for every message sent or received, so
+    # as with MPPMessage, don't give each one a __dict__.
+    __slots__ = ('timestamp', 'next_timestamp', 'data', 'settings')
+
     def __init__(self, timestamp: float, next_timestamp: Optional[float] = None,
                  data: MessageObject = None,
                  settings: Optional[Settings] = None
@@ -88,18 +107,32 @@ class Communicator:
         self._index = index
         self._declared_ports = declared_ports
         self._post_office = PostOffice()
+        # Data object that was sent last and its encoding, see
+        # __encode_data. This is kept until the next send of reusable data,
+        # so that sending the same object on several slots or ports in a
+        # row encodes it only once.
+        self._last_sent_data = None     # type: Optional[Tuple[Any, bytes]]
         self._profiler = profiler
 
         self._servers = list()  # type: List[TransportServer]
 
         # indexed by remote instance id
         self._clients = dict()  # type: Dict[Reference, MPPClient]
+        # for ireceive_message, created on first use
+        self._receive_pool = None   # type: Optional[ThreadPoolExecutor]
+        # when each pending receive was started, for profiling
+        self._receive_start_times = dict()  # type: Dict[Future[bytes], float]
 
         for server_type in transport_server_types:
-            server = server_type(self._post_office)
-            self._servers.append(server)
+            try:
+                server = server_type(self._post_office)
+                self._servers.append(server)
+            except ServerNotSupported as e:
+                _logger.debug('Not using {}: {}'.format(
+                    server_type.__name__, e))
 
         self._ports = dict()   # type: Dict[str, Port]
+        self._ports_by_operator = dict()    # type: Dict[Operator, List[str]]
 
     def get_locations(self) -> List[str]:
         """Returns a list of locations that we can be reached at.
@@ -141,6 +174,12 @@ class Communicator:
         else:
             self._ports = self.__ports_from_conduits(conduits)
 
+        self._ports_by_operator = dict()
+        for port_name, port in self._ports.items():
+            if port.operator not in self._ports_by_operator:
+                self._ports_by_operator[port.operator] = list()
+            self._ports_by_operator[port.operator].append(port_name)
+
         self._muscle_settings_in = self.__settings_in_port(conduits)
 
     def settings_in_connected(self) -> bool:
@@ -151,17 +190,15 @@ class Communicator:
     def list_ports(self) -> Dict[Operator, List[str]]:
         """Returns a description of the ports this Communicator has.
 
+        The ports do not change after :meth:`connect`, so this returns
+        the same object every time. It must not be modified.
+
         Returns:
             A dictionary, indexed by Operator, containing lists of
             port names. Operators with no associated ports are not
             included.
         """
-        result = dict()     # type: Dict[Operator, List[str]]
-        for port_name, port in self._ports.items():
-            if port.operator not in result:
-                result[port.operator] = list()
-            result[port.operator].append(port_name)
-        return result
+        return self._ports_by_operator
 
     def port_exists(self, port_name: str) -> bool:
         """Returns whether a port with the given name exists.
@@ -179,6 +216,19 @@ class Communicator:
         """
         return self._ports[port_name]
 
+    def get_port_or_none(self, port_name: str) -> Optional[Port]:
+        """Returns the Port object for a port, if it exists.
+
+        This combines :meth:`port_exists` and :meth:`get_port`.
+
+        Args:
+            port_name: The port to retrieve.
+
+        Returns:
+            The port, or None if there is no port with this name.
+        """
+        return self._ports.get(port_name)
+
     def send_message(
             self, port_name: str, message: Message,
             slot: Optional[int] = None,
@@ -224,16 +274,29 @@ class Communicator:
         if port.is_resizable():
             port_length = port.get_length()
 
+        encoded_data = None     # type: Optional[bytes]
+        if (
+                len(recv_endpoints) > 1 or
+                isinstance(message.data, _REUSABLE_DATA_TYPES)):
+            # encode the data only once for all receivers, and across sends
+            # of the same data where possible
+            encoded_data = self.__encode_data(message.data)
+
+        # Endpoint.ref() builds a new Reference each time, so do that only
+        # once for each endpoint
+        snd_ref = snd_endpoint.ref()
+        num_messages = port.get_num_messages(slot)
         for recv_endpoint in recv_endpoints:
-            mcp_message = MPPMessage(snd_endpoint.ref(), recv_endpoint.ref(),
+            recv_ref = recv_endpoint.ref()
+            mcp_message = MPPMessage(snd_ref, recv_ref,
                                      port_length,
                                      message.timestamp, message.next_timestamp,
                                      cast(Settings, message.settings),
-                                     port.get_num_messages(slot),
+                                     num_messages,
                                      checkpoints_considered_until,
                                      message.data)
-            encoded_message = mcp_message.encoded()
-            self._post_office.deposit(recv_endpoint.ref(), encoded_message)
+            encoded_message = mcp_message.encoded(encoded_data)
+            self._post_office.deposit(recv_ref, encoded_message)
 
         port.increment_num_messages(slot)
 
@@ -242,8 +305,45 @@ class Communicator:
             profile_event.port_length = port.get_length()
         profile_event.message_size = len(encoded_message)
 
+    def ireceive_message(self, port_name: str, slot: Optional[int] = None
+                         ) -> 'Future[bytes]':
+        """Start receiving a message in the background.
+
+        This requests the next message on the given port and slot from
+        the sender, but does not wait for it to arrive. Several
+        messages can be requested this way, so that they are
+        transferred concurrently.
+
+        To complete the receive, pass the returned future to
+        :meth:`receive_message` together with the same port and slot.
+        There can be at most one receive in progress for any given
+        port and slot.
+
+        Args:
+            port_name: The endpoint on which a message is to be
+                    received. This must be connected.
+            slot: The slot to receive the message on, if any.
+
+        Returns:
+            A future for the encoded message.
+        """
+        slot_list = [] if slot is None else [slot]
+        recv_endpoint = self.__get_endpoint(port_name, slot_list)
+        snd_endpoint = self._peer_manager.get_peer_endpoints(
+                recv_endpoint.port, slot_list)[0]
+        client = self.__get_client(snd_endpoint.instance())
+
+        if self._receive_pool is None:
+            self._receive_pool = ThreadPoolExecutor(
+                    _MAX_RECEIVE_THREADS, 'MessageReceiver')
+        start_time = time()
+        pending = self._receive_pool.submit(client.receive, recv_endpoint.ref())
+        self._receive_start_times[pending] = start_time
+        return pending
+
     def receive_message(self, port_name: str, slot: Optional[int] = None,
-                        default: Optional[Message] = None
+                        default: Optional[Message] = None,
+                        pending: Optional['Future[bytes]'] = None
                         ) -> Tuple[Message, float]:
         """Receive a message and attached settings overlay.
 
@@ -260,6 +360,9 @@ class Communicator:
                     received.
             slot: The slot to receive the message on, if any.
             default: A message to return if this port is not connected.
+            pending: A future returned by :meth:`ireceive_message` for
+                    this port and slot, if the receive was started
+                    already.
 
         Returns:
             The received message, with message.settings holding
@@ -293,9 +396,8 @@ class Communicator:
                         port_name))
             return default, float('-inf')
 
-        if port_name in self._ports:
-            port = self._ports[port_name]
-        else:
+        port = self._ports.get(port_name)
+        if port is None:
             # it's muscle_settings_in here, because we check for unknown
             # user ports in Instance already, and we don't have any other
             # built-in automatic ports.
@@ -303,20 +405,29 @@ class Communicator:
 
         profile_event = self._profiler.start(ProfileEventType.RECEIVE, port,
                                              None, slot, None)
+        if pending is not None:
+            # the transfer started when the receive was issued
+            start_time = self._receive_start_times.pop(pending, None)
+            if start_time is not None:
+                profile_event.start_time = Timestamp(start_time)
 
         # peer_manager already checks that there is at most one snd_endpoint
         # connected to the port we receive on
         snd_endpoint = self._peer_manager.get_peer_endpoints(
                 recv_endpoint.port, slot_list)[0]
-        client = self.__get_client(snd_endpoint.instance())
-        mpp_message_bytes = client.receive(recv_endpoint.ref())
+        if pending is None:
+            client = self.__get_client(snd_endpoint.instance())
+            mpp_message_bytes = client.receive(recv_endpoint.ref())
+        else:
+            mpp_message_bytes = pending.result()
         mpp_message = MPPMessage.from_bytes(mpp_message_bytes)
 
         if mpp_message.port_length is not None:
             if port.is_resizable():
                 port.set_length(mpp_message.port_length)
 
-        if isinstance(mpp_message.data, ClosePort):
+        is_close_port = isinstance(mpp_message.data, ClosePort)
+        if is_close_port:
             port.set_closed(slot)
 
         message = Message(
@@ -344,11 +455,35 @@ class Communicator:
         port.increment_num_messages(slot)
 
         _logger.debug('Received message on {}'.format(port_and_slot))
-        if isinstance(mpp_message.data, ClosePort):
+        if is_close_port:
             _logger.debug('Port {} is now closed'.format(port_and_slot))
 
         return message, mpp_message.saved_until
 
+    def cancel_receive(self, port_name: str, slot: Optional[int],
+                       pending: 'Future[bytes]') -> None:
+        """Abandon a receive started with :meth:`ireceive_message`.
+
+        If the message has not been requested from the sender yet, the
+        request is cancelled. Otherwise, this waits for the message to
+        arrive and processes it as :meth:`receive_message` would, so
+        that the port state stays consistent (e.g. a received ClosePort
+        still closes the port), and then discards it.
+
+        Args:
+            port_name: The port the receive was started on.
+            slot: The slot the receive was started on, if any.
+            pending: The future returned by :meth:`ireceive_message`.
+        """
+        if pending.cancel():
+            del self._receive_start_times[pending]
+            return
+
+        try:
+            self.receive_message(port_name, slot, pending=pending)
+        except Exception as e:
+            _logger.debug(f'Discarding failed receive on {port_name}: {e}')
+
     def close_port(self, port_name: str, slot: Optional[int] = None
                    ) -> None:
         """Closes the given port.
@@ -359,17 +494,35 @@ class Communicator:
 
         Args:
             port_name: The name of the port to close.
+            slot: The slot to close, if any.
+        """
+        self.close_ports([(port_name, slot)])
+
+    def close_ports(self, ports: List[Tuple[str, Optional[int]]]) -> None:
+        """Closes the given ports.
+
+        This is equivalent to calling :meth:`close_port` for each of
+        them, but shares a single close message between all of them.
+
+        Args:
+            ports: The ports to close, as tuples of port name and
+                    slot, or None for non-vector ports.
         """
         message = Message(float('inf'), None, ClosePort(), Settings())
-        if slot is None:
-            _logger.debug('Closing port {}'.format(port_name))
-        else:
-            _logger.debug('Closing port {}[{}]'.format(port_name, slot))
-        self.send_message(port_name, message, slot)
+        for port_name, slot in ports:
+            if slot is None:
+                _logger.debug('Closing port {}'.format(port_name))
+            else:
+                _logger.debug('Closing port {}[{}]'.format(port_name, slot))
+            self.send_message(port_name, message, slot)
 
     def shutdown(self) -> None:
         """Shuts down the Communicator, closing connections.
         """
+        if self._receive_pool is not None:
+            # don't wait, closing the clients below will end any receives
+            self._receive_pool.shutdown(wait=False)
+
         for client in self._clients.values():
             client.close()
 
@@ -494,6 +647,30 @@ class Communicator:
         return Port('muscle_settings_in', Operator.F_INIT, False, False,
                     len(self._index), [])
 
+    def __encode_data(self, data: Any) -> bytes:
+        """Encodes message data for sending.
+
+        If the same immutable object is sent repeatedly, for example to
+        several ports in a row, then it is encoded only the first time.
+
+        Args:
+            data: The data to encode.
+
+        Returns:
+            The encoded data.
+        """
+        if not isinstance(data, _REUSABLE_DATA_TYPES):
+            return MPPMessage.encode_data(data)
+
+        if self._last_sent_data is not None:
+            last_data, last_encoded = self._last_sent_data
+            if last_data is data:
+                return last_encoded
+
+        encoded_data = MPPMessage.encode_data(data)
+        self._last_sent_data = (data, encoded_data)
+        return encoded_data
+
     def __get_client(self, instance: Reference) -> MPPClient:
         """Get or create a client to connect to the given instance.
 
@@ -503,12 +680,14 @@ class Communicator:
         Returns:
             An existing or new MCP client.
         """
-        if instance not in self._clients:
+        client = self._clients.get(instance)
+        if client is None:
             locations = self._peer_manager.get_peer_locations(instance)
             _logger.info(f'Connecting to peer {instance} at {locations}')
-            self._clients[instance] = MPPClient(locations)
+            client = MPPClient(locations)
+            self._clients[instance] = client
 
-        return self._clients[instance]
+        return client
 
     def __get_endpoint(self, port_name: str, slot: List[int]) -> Endpoint:
         """Determines the endpoint on our side.
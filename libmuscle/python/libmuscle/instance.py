@@ -1,8 +1,7 @@
-from copy import copy
+from concurrent.futures import FIRST_COMPLETED, Future, wait
 from enum import Flag, auto
 import logging
 import os
-import sys
 from typing import cast, Dict, List, Optional, Tuple, overload
 # TODO: import from typing module when dropping support for python 3.7
 from typing_extensions import Literal
@@ -19,16 +18,20 @@ from libmuscle.logging import LogLevel
 from libmuscle.logging_handler import MuscleManagerHandler
 from libmuscle.mpp_message import ClosePort
 from libmuscle.mmp_client import MMPClient
+from libmuscle.port import Port as CommunicatorPort
 from libmuscle.profiler import Profiler
 from libmuscle.profiling import ProfileEventType
 from libmuscle.snapshot_manager import SnapshotManager
-from libmuscle.util import extract_log_file_location
+from libmuscle.util import extract_log_file_location, parse_muscle_args
 
 
 _logger = logging.getLogger(__name__)
 
 
-_FInitCacheType = Dict[Tuple[str, Optional[int]], Message]
+_FInitCacheType = Dict[str, Dict[Optional[int], Message]]
+
+
+_PortsType = Dict[Operator, List[Tuple[str, CommunicatorPort]]]
 
 
 class InstanceFlags(Flag):
@@ -124,6 +127,9 @@ class Instance:
         self._name, self._index = self.__make_full_name()
         """Name and index of this instance."""
 
+        self.__instance_name = self._name + self._index
+        """Full name of this instance, see _instance_name()."""
+
         mmp_location = self.__extract_manager_location()
         self.__manager = MMPClient(mmp_location)
         """Client object for talking to the manager."""
@@ -173,11 +179,10 @@ class Instance:
         self._f_init_cache = dict()     # type: _FInitCacheType
         """Stores pre-received messages for f_init ports"""
 
-        self._register()
-        self._connect()
+        self._register_and_connect()
 
         # Note: get_checkpoint_info needs to have the ports initialized
-        # so it comes after self._connect()
+        # so it comes after self._register_and_connect()
         checkpoint_info = self.__manager.get_checkpoint_info(
                 self._instance_name())
 
@@ -263,10 +268,15 @@ class Instance:
                 self._save_snapshot(None, True, self.__f_init_max_timestamp)
 
         if not do_reuse:
-            self.__close_ports()
-            self._communicator.shutdown()
-            self._deregister()
-            self.__manager.close()
+            # Write out the last snapshots before our peers see a ClosePort
+            # and possibly shut down the workflow.
+            try:
+                self._snapshot_manager.shutdown()
+            finally:
+                self.__close_ports()
+                self._communicator.shutdown()
+                self._deregister()
+                self.__manager.close()
 
         self._api_guard.reuse_instance_done(do_reuse)
         return do_reuse
@@ -354,7 +364,10 @@ class Instance:
             containing lists of port names. Operators with no associated ports
             are not included.
         """
-        return self._communicator.list_ports()
+        return {
+                operator: port_names.copy()
+                for operator, port_names in
+                self._communicator.list_ports().items()}
 
     def is_connected(self, port: str) -> bool:
         """Returns whether the given port is connected.
@@ -440,9 +453,13 @@ class Instance:
         """
         self.__check_port(port_name)
         if message.settings is None:
-            message = copy(message)
-            message.settings = self._settings_manager.overlay
+            message = Message(
+                    message.timestamp, message.next_timestamp, message.data,
+                    self._settings_manager.overlay)
 
+        # The manager must see our snapshots before it can see any snapshot
+        # of a peer that has received this message, so wait for them here.
+        self._snapshot_manager.flush()
         self._communicator.send_message(
                 port_name, message, slot,
                 self._trigger_manager.checkpoints_considered_until())
@@ -698,28 +715,29 @@ class Instance:
         """Return max timestamp of pre-received F_INIT messages
         """
         return max(
-                (msg.timestamp for msg in self._f_init_cache.values()),
+                (msg.timestamp
+                 for slot_msgs in self._f_init_cache.values()
+                 for msg in slot_msgs.values()),
                 default=None)
 
-    def _register(self) -> None:
-        """Register this instance with the manager.
+    def _register_and_connect(self) -> None:
+        """Register this instance and connect it to its peers.
+
+        Registration, getting the peers and getting the settings are
+        done in a single call to the manager.
         """
         register_event = self._profiler.start(ProfileEventType.REGISTER)
         locations = self._communicator.get_locations()
         port_list = self.__list_declared_ports()
-        self.__manager.register_instance(
-                self._instance_name(), locations, port_list)
+        conduits, peer_dims, peer_locations, settings = (
+                self.__manager.register_and_connect(
+                    self._instance_name(), locations, port_list))
         register_event.stop()
         _logger.info('Registered with the manager')
 
-    def _connect(self) -> None:
-        """Connect this instance to the given peers / conduits.
-        """
         connect_event = self._profiler.start(ProfileEventType.CONNECT)
-        conduits, peer_dims, peer_locations = self.__manager.request_peers(
-                self._instance_name())
         self._communicator.connect(conduits, peer_dims, peer_locations)
-        self._settings_manager.base = self.__manager.get_settings()
+        self._settings_manager.base = settings
         connect_event.stop()
         _logger.info('Received peer locations and base settings')
 
@@ -733,8 +751,8 @@ class Instance:
         self._profiler.shutdown()
         _logger.info('Deregistered from the manager')
 
-    @staticmethod
-    def __extract_manager_location() -> str:
+    @classmethod
+    def __extract_manager_location(cls) -> str:
         """Gets the manager network location from the command line.
 
         We use a --muscle-manager=<host:port> argument to tell the
@@ -747,13 +765,9 @@ class Instance:
         Returns:
             A connection string, or None.
         """
-        # Neither getopt, optparse, or argparse will let me pick out
-        # just one option from the command line and ignore the rest.
-        # So we do it by hand.
-        prefix = '--muscle-manager='
-        for arg in sys.argv[1:]:
-            if arg.startswith(prefix):
-                return arg[len(prefix):]
+        location = parse_muscle_args().get('manager')
+        if location is not None:
+            return location
 
         return os.environ.get('MUSCLE_MANAGER', 'tcp:localhost:9000')
 
@@ -764,7 +778,11 @@ class Instance:
 
         logfile = extract_log_file_location('muscle3.{}.log'.format(id_str))
         if logfile is not None:
-            local_handler = logging.FileHandler(str(logfile), mode='w')
+            # Creating the file is delayed until there's something to log,
+            # to keep it off the start-up path. If there's an old log
+            # file, we open it right away so that it's truncated.
+            local_handler = logging.FileHandler(
+                    str(logfile), mode='w', delay=not logfile.exists())
             formatter = logging.Formatter(
                     '%(asctime)-15s: %(levelname)-7s %(name)s: %(message)s')
             local_handler.setFormatter(formatter)
@@ -796,12 +814,13 @@ class Instance:
             self._do_init = False
             return True
 
-        f_init_connected = self._have_f_init_connections()
+        ports = self.__resolve_ports()
+        f_init_connected = self._have_f_init_connections(ports)
 
         # resume from final
         if self._first_run and self._snapshot_manager.resuming_from_final():
             if f_init_connected:
-                got_f_init_messages = self._pre_receive(apply_overlay)
+                got_f_init_messages = self._pre_receive(apply_overlay, ports)
                 self._do_resume = True
                 self._do_init = True
                 return got_f_init_messages
@@ -819,7 +838,7 @@ class Instance:
             return self._first_run
 
         # not resuming and f_init connected, run while we get messages
-        got_f_init_messages = self._pre_receive(apply_overlay)
+        got_f_init_messages = self._pre_receive(apply_overlay, ports)
         self._do_init = got_f_init_messages
         return got_f_init_messages
 
@@ -828,6 +847,9 @@ class Instance:
             f_init_max_timestamp: Optional[float] = None) -> None:
         """Save a snapshot to disk and notify manager.
 
+        Writing and notifying happen in the background, see
+        :meth:`SnapshotManager.save_snapshot`.
+
         Args:
             message: The data to save
             final: Whether this is a final snapshot or an intermediate
@@ -850,13 +872,11 @@ class Instance:
         This implements receive and receive_with_settings, see the
         description of those.
         """
-        self.__check_port(port_name)
-
-        port = self._communicator.get_port(port_name)
+        port = self.__check_port(port_name)
         if port.operator == Operator.F_INIT:
-            if (port_name, slot) in self._f_init_cache:
-                msg = self._f_init_cache[(port_name, slot)]
-                del self._f_init_cache[(port_name, slot)]
+            slot_msgs = self._f_init_cache.get(port_name)
+            msg = slot_msgs.pop(slot, None) if slot_msgs else None
+            if msg is not None:
                 if with_settings and msg.settings is None:
                     err_msg = ('If you use receive_with_settings()'
                                ' on an F_INIT port, then you have to'
@@ -922,16 +942,10 @@ class Instance:
 
             return name, index
 
-        # Neither getopt, optparse, or argparse will let me pick out
-        # just one option from the command line and ignore the rest.
-        # So we do it by hand.
-        prefix_tag = '--muscle-instance='
-        for arg in sys.argv[1:]:
-            if arg.startswith(prefix_tag):
-                prefix_str = arg[len(prefix_tag):]
-                prefix_ref = Reference(prefix_str)
-                name, index = split_reference(prefix_ref)
-                break
+        prefix_str = parse_muscle_args().get('instance')
+        if prefix_str is not None:
+            prefix_ref = Reference(prefix_str)
+            name, index = split_reference(prefix_ref)
         else:
             if 'MUSCLE_INSTANCE' in os.environ:
                 prefix_ref = Reference(os.environ['MUSCLE_INSTANCE'])
@@ -949,53 +963,80 @@ class Instance:
         This returns a list of ymmsl.Port objects, which have only the
         name and the operator, not libmuscle.Port, which has more.
         """
-        result = list()
-        if self._declared_ports is not None:
-            for operator, port_names in self._declared_ports.items():
-                for name in port_names:
-                    if name.endswith('[]'):
-                        name = name[:-2]
-                    result.append(Port(Identifier(name), operator))
-        return result
+        if self._declared_ports is None:
+            return list()
+
+        return [
+                Port(Identifier(name[:-2] if name.endswith('[]') else name),
+                     operator)
+                for operator, port_names in self._declared_ports.items()
+                for name in port_names]
 
     def _instance_name(self) -> Reference:
         """Returns the full instance name.
         """
-        return self._name + self._index
+        return self.__instance_name
+
+    def __check_port(self, port_name: str) -> CommunicatorPort:
+        """Checks that the given port exists, and returns it.
 
-    def __check_port(self, port_name: str) -> None:
-        if not self._communicator.port_exists(port_name):
+        Shuts down and raises if the port does not exist.
+        """
+        port = self._communicator.get_port_or_none(port_name)
+        if port is None:
             err_msg = (('Port "{}" does not exist on "{}". Please check'
                         ' the name and the list of ports you gave for'
                         ' this component.').format(port_name, self._name))
             self.__shutdown(err_msg)
             raise RuntimeError(err_msg)
+        return port
+
+    def __resolve_ports(self) -> _PortsType:
+        """Looks up the Port objects for all our ports.
 
-    def _have_f_init_connections(self) -> bool:
+        This is used to look up each port once, rather than many times
+        over in the various loops over all the ports.
+
+        Returns:
+            A list of (port name, Port) tuples for each operator that
+            has ports.
+        """
+        return {
+                operator: [
+                    (port_name, self._communicator.get_port(port_name))
+                    for port_name in port_names]
+                for operator, port_names in
+                self._communicator.list_ports().items()}
+
+    def _have_f_init_connections(self, ports: _PortsType) -> bool:
         """Checks whether we have connected F_INIT ports.
 
         This includes muscle_settings_in, and any user-defined ports.
+
+        Args:
+            ports: Our ports, as returned by __resolve_ports().
         """
-        ports = self._communicator.list_ports()
         f_init_connected = any(
-                [self.is_connected(port)
-                 for port in ports.get(Operator.F_INIT, [])])
+                port.is_connected()
+                for _, port in ports.get(Operator.F_INIT, ()))
         return f_init_connected or self._communicator.settings_in_connected()
 
-    def _pre_receive(self, apply_overlay: Optional[bool]) -> bool:
+    def _pre_receive(
+            self, apply_overlay: Optional[bool], ports: _PortsType) -> bool:
         """Pre-receives on all ports.
 
         This includes muscle_settings_in and all user-defined ports.
 
+        Args:
+            apply_overlay: Whether to apply received settings overlays.
+            ports: Our ports, as returned by __resolve_ports().
+
         Returns:
             True iff no ClosePort messages were received.
         """
-        all_ports_open = self.__receive_settings()
-        self.__pre_receive_f_init(apply_overlay)
-        for message in self._f_init_cache.values():
-            if isinstance(message.data, ClosePort):
-                all_ports_open = False
-        return all_ports_open
+        settings_open = self.__receive_settings()
+        f_init_open = self.__pre_receive_f_init(apply_overlay, ports)
+        return settings_open and f_init_open
 
     def __receive_settings(self) -> bool:
         """Receives settings on muscle_settings_in.
@@ -1003,9 +1044,14 @@ class Instance:
         Returns:
             False iff the port is connnected and ClosePort was received.
         """
-        default_message = Message(0.0, None, Settings(), Settings())
+        if not self._communicator.settings_in_connected():
+            # Nothing to receive, so skip the default message and just
+            # reset the overlay.
+            self._settings_manager.overlay = Settings()
+            return True
+
         message, saved_until = self._communicator.receive_message(
-                'muscle_settings_in', None, default_message)
+                'muscle_settings_in')
         if isinstance(message.data, ClosePort):
             return False
         if not isinstance(message.data, Settings):
@@ -1025,11 +1071,19 @@ class Instance:
         self._trigger_manager.harmonise_wall_time(saved_until)
         return True
 
-    def __pre_receive_f_init(self, apply_overlay: Optional[bool]) -> None:
+    def __pre_receive_f_init(
+            self, apply_overlay: Optional[bool], ports: _PortsType) -> bool:
         """Receives on all ports connected to F_INIT.
 
         This receives all incoming messages on F_INIT and stores them
         in self._f_init_cache.
+
+        Args:
+            apply_overlay: Whether to apply received settings overlays.
+            ports: Our ports, as returned by __resolve_ports().
+
+        Returns:
+            True iff no ClosePort messages were received.
         """
         if apply_overlay is not None:
             warnings.warn(
@@ -1039,31 +1093,83 @@ class Instance:
         else:
             apply_overlay = InstanceFlags.DONT_APPLY_OVERLAY not in self._flags
 
-        def pre_receive(port_name: str, slot: Optional[int]) -> None:
+        all_ports_open = True
+
+        # Settings overlays are applied only after all the messages in a
+        # batch have been received, because a failed compatibility check
+        # shuts down the instance, and that must not happen while other
+        # receives are still in progress in the background.
+        received = list()   # type: List[Tuple[str, Message]]
+
+        def pre_receive(
+                port_name: str, slot: Optional[int],
+                pending: Optional['Future[bytes]']) -> None:
+            nonlocal all_ports_open
             msg, saved_until = self._communicator.receive_message(
-                    port_name, slot)
-            self._f_init_cache[(port_name, slot)] = msg
+                    port_name, slot, pending=pending)
+            self._f_init_cache.setdefault(port_name, dict())[slot] = msg
+            if isinstance(msg.data, ClosePort):
+                all_ports_open = False
+            self._trigger_manager.harmonise_wall_time(saved_until)
             if apply_overlay:
+                received.append((port_name, msg))
+
+        # If there are several receives to do, we start them all first, so
+        # that the messages are transferred concurrently, then process them
+        # in order. A single receive has nothing to overlap with, so then
+        # we skip the background threads and receive directly.
+        receives = list()   # type: List[Tuple[str, Optional[int]]]
+
+        def start_receive(port_name: str, slot: Optional[int]) -> None:
+            receives.append((port_name, slot))
+
+        def finish_receives() -> None:
+            if len(receives) == 1:
+                port_name, slot = receives[0]
+                pre_receive(port_name, slot, None)
+            else:
+                pending = [
+                        self._communicator.ireceive_message(port_name, slot)
+                        for port_name, slot in receives]
+                num_done = 0
+                try:
+                    for (port_name, slot), fut in zip(receives, pending):
+                        pre_receive(port_name, slot, fut)
+                        num_done += 1
+                finally:
+                    # If a receive failed, don't leave the ones after it
+                    # running unattended, or they may swallow messages
+                    # (e.g. a ClosePort) that the shutdown will wait for.
+                    for (port_name, slot), fut in list(
+                            zip(receives, pending))[num_done + 1:]:
+                        self._communicator.cancel_receive(
+                                port_name, slot, fut)
+            receives.clear()
+
+            for port_name, msg in received:
                 self.__apply_overlay(msg)
                 self.__check_compatibility(port_name, msg.settings)
                 msg.settings = None
-            self._trigger_manager.harmonise_wall_time(saved_until)
+            received.clear()
 
         self._f_init_cache = dict()
-        ports = self._communicator.list_ports()
-        for port_name in ports.get(Operator.F_INIT, []):
+        for port_name, port in ports.get(Operator.F_INIT, ()):
             _logger.debug('Pre-receiving on port {}'.format(port_name))
-            port = self._communicator.get_port(port_name)
             if not port.is_connected():
                 continue
             if not port.is_vector():
-                pre_receive(port_name, None)
+                start_receive(port_name, None)
             else:
-                pre_receive(port_name, 0)
-                # The above receives the length, if needed, so now we can
-                # get the rest.
+                start_receive(port_name, 0)
+                if port.is_resizable():
+                    # Receiving on slot 0 sets the length, which we need
+                    # to know before we can get the rest.
+                    finish_receives()
                 for slot in range(1, port.get_length()):
-                    pre_receive(port_name, slot)
+                    start_receive(port_name, slot)
+
+        finish_receives()
+        return all_ports_open
 
     def _set_remote_log_level(self) -> None:
         """Sets the remote log level.
@@ -1149,7 +1255,9 @@ class Instance:
                     received.
             overlay: The received overlay.
         """
-        if overlay is None:
+        # After __apply_overlay(), our overlay is often the very object
+        # that we received, and then there's no need to compare them.
+        if overlay is None or overlay is self._settings_manager.overlay:
             return
         if self._settings_manager.overlay != overlay:
             err_msg = (('Unexpectedly received data from a'
@@ -1161,77 +1269,92 @@ class Instance:
             self.__shutdown(err_msg)
             raise RuntimeError(err_msg)
 
-    def __close_outgoing_ports(self) -> None:
-        """Closes outgoing ports.
-
-        This sends a close port message on all slots of all outgoing
-        ports.
-        """
-        for operator, ports in self._communicator.list_ports().items():
-            if operator.allows_sending():
-                for port_name in ports:
-                    port = self._communicator.get_port(port_name)
-                    if port.is_vector():
-                        for slot in range(port.get_length()):
-                            self._communicator.close_port(port_name, slot)
-                    else:
-                        self._communicator.close_port(port_name)
-
-    def __drain_incoming_port(self, port_name: str) -> None:
+    def __drain_incoming_port(
+            self, port_name: str, port: CommunicatorPort) -> None:
         """Receives messages until a ClosePort is received.
 
         Receives at least once.
 
         Args:
             port_name: Port to drain.
+            port: The corresponding Port object.
         """
-        port = self._communicator.get_port(port_name)
         while port.is_open():
             # TODO: log warning if not a ClosePort
             self._communicator.receive_message(port_name)
 
-    def __drain_incoming_vector_port(self, port_name: str) -> None:
+    def __drain_incoming_vector_port(
+            self, port_name: str, port: CommunicatorPort) -> None:
         """Receives messages until a ClosePort is received.
 
         Works with (resizable) vector ports.
 
         Args:
             port_name: Port to drain.
+            port: The corresponding Port object.
         """
-        port = self._communicator.get_port(port_name)
-        while not all([not port.is_open(slot)
-                       for slot in range(port.get_length())]):
-            for slot in range(port.get_length()):
-                if port.is_open(slot):
-                    self._communicator.receive_message(port_name, slot)
-
-    def __close_incoming_ports(self) -> None:
-        """Closes incoming ports.
+        if port.is_resizable():
+            # A received message may resize the port and reopen its slots,
+            # so we go around one at a time and check again each time.
+            length = port.get_length()
+            while any(port.is_open(slot) for slot in range(length)):
+                for slot in range(length):
+                    if port.is_open(slot):
+                        self._communicator.receive_message(port_name, slot)
+                length = port.get_length()
+            return
 
-        This receives on all incoming ports until a ClosePort is
-        received on them, signaling that there will be no more
-        messages, and allowing the sending instance to shut down
-        cleanly.
-        """
-        for operator, port_names in self._communicator.list_ports().items():
-            if operator.allows_receiving():
-                for port_name in port_names:
-                    port = self._communicator.get_port(port_name)
-                    if not port.is_connected():
-                        continue
-                    if not port.is_vector():
-                        self.__drain_incoming_port(port_name)
-                    else:
-                        self.__drain_incoming_vector_port(port_name)
+        # Receive on all slots concurrently, and keep receiving on each
+        # slot until it's closed.
+        pending = {
+                self._communicator.ireceive_message(port_name, slot): slot
+                for slot in range(port.get_length())
+                if port.is_open(slot)}  # type: Dict[Future[bytes], int]
+        while pending:
+            done, _ = wait(pending, return_when=FIRST_COMPLETED)
+            for fut in done:
+                slot = pending.pop(fut)
+                self._communicator.receive_message(
+                        port_name, slot, pending=fut)
+                if port.is_open(slot):
+                    fut = self._communicator.ireceive_message(port_name, slot)
+                    pending[fut] = slot
 
     def __close_ports(self) -> None:
         """Closes all ports.
 
         This sends a close port message on all slots of all outgoing
-        ports, then receives one on all incoming ports.
+        ports, then receives one on all incoming ports. Sending is
+        non-blocking, so the peers can pick up the close port messages
+        while we wait for theirs.
+
+        Receiving until a ClosePort is received on all incoming ports
+        signals that there will be no more messages, and allows the
+        sending instance to shut down cleanly.
         """
-        self.__close_outgoing_ports()
-        self.__close_incoming_ports()
+        to_close = list()   # type: List[Tuple[str, Optional[int]]]
+        to_drain = list()   # type: List[Tuple[str, CommunicatorPort]]
+        for operator, op_ports in self.__resolve_ports().items():
+            sending = operator.allows_sending()
+            receiving = operator.allows_receiving()
+            for port_name, port in op_ports:
+                if sending:
+                    if port.is_vector():
+                        to_close.extend(
+                                (port_name, slot)
+                                for slot in range(port.get_length()))
+                    else:
+                        to_close.append((port_name, None))
+                if receiving and port.is_connected():
+                    to_drain.append((port_name, port))
+
+        self._communicator.close_ports(to_close)
+
+        for port_name, port in to_drain:
+            if not port.is_vector():
+                self.__drain_incoming_port(port_name, port)
+            else:
+                self.__drain_incoming_vector_port(port_name, port)
 
     def __shutdown(self, message: str) -> None:
         """Shuts down simulation.
@@ -1241,6 +1364,10 @@ class Instance:
         """
         if not self.__is_shut_down:
             _logger.critical(message)
+            try:
+                self._snapshot_manager.shutdown()
+            except RuntimeError as e:
+                _logger.error(str(e))
             self.__close_ports()
             self._communicator.shutdown()
             self._deregister()
@@ -8,8 +8,7 @@ from ymmsl import Configuration
 
 from libmuscle.manager.instantiator import (
         CancelAllRequest, CrashedResult, InstantiatorRequest,
-        InstantiationRequest, ProcessStatus, ShutdownRequest)
-from libmuscle.manager.qcgpj_instantiator import Process, QCGPJInstantiator
+        InstantiationRequest, Process, ProcessStatus, ShutdownRequest)
 from libmuscle.manager.run_dir import RunDir
 from libmuscle.planner.planner import Planner, Resources
 
@@ -70,6 +69,11 @@ class InstanceManager:
         self._results_in = Queue()      # type: Queue[_ResultType]
         self._log_records_in = Queue()  # type: Queue[logging.LogRecord]
 
+        # Imported here rather than at the top, because importing QCG-PJ
+        # is slow, and libmuscle imports this module via the runner in
+        # every instance, which never needs it.
+        from libmuscle.manager.qcgpj_instantiator import QCGPJInstantiator
+
         self._instantiator = QCGPJInstantiator(
                 self._resources_in, self._requests_out, self._results_in,
                 self._log_records_in, self._run_dir.path)
@@ -16,6 +16,7 @@ from libmuscle.manager.logger import Logger
 from libmuscle.manager.run_dir import RunDir
 from libmuscle.manager.snapshot_registry import SnapshotRegistry
 from libmuscle.manager.topology_store import TopologyStore
+from libmuscle.mcp.buffer_pool import TieredBufferPool
 from libmuscle.mcp.protocol import RequestType, ResponseType
 from libmuscle.mcp.tcp_transport_server import TcpTransportServer
 from libmuscle.mcp.transport_server import RequestHandler
@@ -105,6 +106,8 @@ class MMPRequestHandler(RequestHandler):
             response = self._submit_snapshot(*req_args)
         elif req_type == RequestType.GET_CHECKPOINT_INFO.value:
             response = self._get_checkpoint_info(*req_args)
+        elif req_type == RequestType.REGISTER_AND_CONNECT.value:
+            response = self._register_and_connect(*req_args)
 
         return cast(bytes, msgpack.packb(response, use_bin_type=True))
 
@@ -202,6 +205,52 @@ class MMPRequestHandler(RequestHandler):
                 ResponseType.SUCCESS.value,
                 mmp_conduits, mmp_dimensions, instance_locations]
 
+    def _register_and_connect(
+            self, instance_id: str, locations: List[str],
+            ports: List[List[str]], version: str = '') -> Any:
+        """Handle a register and connect request.
+
+        This registers the instance, then gets its peers and the
+        settings, saving the instance two round trips.
+
+        Args:
+            instance_id: ID of the instance to register
+            locations: Locations where it can be reached
+            ports: Ports of this instance
+            version: Version of libmuscle that this instance uses
+
+        Returns:
+            A list containing the following values on success:
+
+            status (ResponseType): SUCCESS
+            conduits (List[List[str]]): Conduits from/to peers
+            dimensions (Dict[str, List[int]]): Dimensions of peer
+                components
+            locations (Dict[str, List[str]]): Locations where peer
+                instances can be contacted.
+            settings (Dict[str, SettingValue]): The global settings
+
+            Or the following values on error:
+
+            status (ResponseType): ERROR
+            error_msg (str): An error message
+
+            Or the following values if the instance was registered,
+            but the peers are not yet available:
+
+            status (ResponseType): PENDING
+            status_msg (str): A message on what we're waiting for.
+        """
+        response = self._register_instance(
+                instance_id, locations, ports, version)
+        if response[0] != ResponseType.SUCCESS.value:
+            return response
+
+        response = self._get_peers(instance_id)
+        if response[0] == ResponseType.SUCCESS.value:
+            response.append(self._configuration.settings.as_ordered_dict())
+        return response
+
     def _deregister_instance(self, instance_id: str) -> Any:
         """Handle a deregister instance request.
 
@@ -353,12 +402,15 @@ class MMPServer:
         self._handler = MMPRequestHandler(
                 logger, configuration, instance_registry, topology_store,
                 snapshot_registry, run_dir)
+        # The handler decodes requests immediately, so we can reuse buffers
+        buffer_pool = TieredBufferPool()
         try:
-            self._server = TcpTransportServer(self._handler, 9000)
+            self._server = TcpTransportServer(self._handler, 9000, buffer_pool)
         except OSError as e:
             if e.errno != errno.EADDRINUSE:
                 raise
-            self._server = TcpTransportServer(self._handler)
+            self._server = TcpTransportServer(
+                    self._handler, buffer_pool=buffer_pool)
 
     def get_location(self) -> str:
         """Returns this server's network location.
@@ -34,6 +34,22 @@ from libmuscle.planner.planner import Resources
 _logger = logging.getLogger(__name__)
 
 
+def _install_uvloop() -> None:
+    """Use uvloop for asyncio if it is available.
+
+    uvloop is a faster drop-in replacement for the standard asyncio event
+    loop. It is an optional dependency, if it's not installed then we
+    use the standard loop.
+    """
+    try:
+        import uvloop
+    except ImportError:
+        return
+
+    uvloop.install()
+    _logger.debug('Using uvloop event loop')
+
+
 class StateTracker:
     """Tracks processes and their state.
 
@@ -131,6 +147,8 @@ class QCGPJInstantiator(mp.Process):
 
         self._send_resources()
 
+        _install_uvloop()
+
         try:
             loop = asyncio.get_event_loop()
             loop.run_until_complete(self._main())
@@ -218,9 +236,9 @@ class QCGPJInstantiator(mp.Process):
         """Cancels all running jobs."""
         # Repeat cancel until they're gone to work around QCG-PJ
         # race condition.
-        while any([
+        while any(
                 not p.status.is_finished()
-                for p in self._state_tracker.processes.values()]):
+                for p in self._state_tracker.processes.values()):
 
             for instance, process in self._state_tracker.processes.items():
                 if process.status.is_finished():
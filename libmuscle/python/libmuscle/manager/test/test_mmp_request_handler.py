@@ -218,6 +218,47 @@ def test_get_peers_pending(mmp_request_handler):
     assert decoded_result[0] == ResponseType.PENDING.value
 
 
+def test_register_and_connect(
+        mmp_configuration, registered_mmp_request_handler,
+        loaded_instance_registry):
+    loaded_instance_registry.remove(Reference('macro'))
+    mmp_configuration.settings['test1'] = 13
+
+    request = [
+            RequestType.REGISTER_AND_CONNECT.value,
+            'macro', ['direct:macro'], [['out', 'O_I'], ['in', 'S']],
+            libmuscle.__version__]
+    encoded_request = msgpack.packb(request, use_bin_type=True)
+
+    result = registered_mmp_request_handler.handle_request(encoded_request)
+    decoded_result = msgpack.unpackb(result, raw=False)
+
+    status, conduits, dims, locations, settings = decoded_result
+    assert status == ResponseType.SUCCESS.value
+    assert conduits[0] == ['macro.out', 'micro.in']
+    assert dims['micro'] == [10, 10]
+    assert locations['micro[0][0]'] == ['direct:micro[0][0]']
+    assert settings == {'test1': 13}
+
+    assert (loaded_instance_registry.get_locations(Reference('macro')) ==
+            ['direct:macro'])
+
+
+def test_register_and_connect_pending(mmp_request_handler, instance_registry):
+    request = [
+            RequestType.REGISTER_AND_CONNECT.value,
+            'macro', ['direct:macro'], [['out', 'O_I'], ['in', 'S']],
+            libmuscle.__version__]
+    encoded_request = msgpack.packb(request, use_bin_type=True)
+
+    result = mmp_request_handler.handle_request(encoded_request)
+    decoded_result = msgpack.unpackb(result, raw=False)
+
+    assert decoded_result[0] == ResponseType.PENDING.value
+    assert instance_registry.get_locations(Reference('macro')) == [
+            'direct:macro']
+
+
 def test_request_peers_fanout(registered_mmp_request_handler):
     request = [RequestType.GET_PEERS.value, 'macro']
     encoded_request = msgpack.packb(request, use_bin_type=True)
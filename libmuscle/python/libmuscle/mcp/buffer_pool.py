@@ -0,0 +1,71 @@
+from bisect import bisect_left
+from queue import Empty, SimpleQueue
+from typing import List, Sequence
+
+
+_DEFAULT_TIER_SIZES = [
+        1 << 10, 1 << 13, 1 << 16, 1 << 19, 1 << 20]
+
+
+class TieredBufferPool:
+    """A pool of reusable receive buffers.
+
+    Receiving a message into a freshly allocated buffer every time
+    creates a lot of garbage if there are many messages. This pool keeps
+    buffers around for reuse instead. Buffers come in a few fixed sizes
+    (tiers), and a request is served from the smallest tier that is
+    large enough. Requests larger than the largest tier get a buffer of
+    exactly the requested size, which is not pooled.
+
+    This class is thread-safe.
+    """
+    def __init__(
+            self, tier_sizes: Sequence[int] = _DEFAULT_TIER_SIZES,
+            max_buffers_per_tier: int = 4) -> None:
+        """Create a TieredBufferPool.
+
+        Args:
+            tier_sizes: Sizes of the buffers in each tier, ascending.
+            max_buffers_per_tier: Maximum number of unused buffers to
+                keep in each tier.
+        """
+        self._tier_sizes = list(tier_sizes)
+        self._max_buffers_per_tier = max_buffers_per_tier
+        self._tiers = [
+                SimpleQueue() for _ in self._tier_sizes
+                ]   # type: List[SimpleQueue[bytearray]]
+
+    def get(self, size: int) -> bytearray:
+        """Get a buffer of at least the given size.
+
+        Args:
+            size: Required size in bytes.
+
+        Returns:
+            A buffer of at least size bytes. Its contents are undefined.
+        """
+        tier = bisect_left(self._tier_sizes, size)
+        if tier == len(self._tier_sizes):
+            return bytearray(size)
+
+        try:
+            return self._tiers[tier].get_nowait()
+        except Empty:
+            return bytearray(self._tier_sizes[tier])
+
+    def put(self, buf: bytearray) -> None:
+        """Return a buffer to the pool.
+
+        The buffer must have been obtained from :meth:`get`, and must
+        not be used by the caller afterwards.
+
+        Args:
+            buf: The buffer to return.
+        """
+        tier = bisect_left(self._tier_sizes, len(buf))
+        if tier == len(self._tier_sizes) or self._tier_sizes[tier] != len(buf):
+            return
+
+        # qsize() is approximate, so this is a soft limit
+        if self._tiers[tier].qsize() < self._max_buffers_per_tier:
+            self._tiers[tier].put(buf)
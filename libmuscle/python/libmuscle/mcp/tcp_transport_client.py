@@ -1,8 +1,10 @@
 import socket
-from typing import Optional
+from typing import cast, Optional, Union
 
+from libmuscle.mcp.buffer_pool import TieredBufferPool
 from libmuscle.mcp.transport_client import TransportClient
-from libmuscle.mcp.tcp_util import recv_all, recv_int64, send_int64
+from libmuscle.mcp.tcp_util import (
+        recv_all, recv_all_into, recv_int64, send_frame)
 
 
 class TcpTransportClient(TransportClient):
@@ -20,14 +22,41 @@ class TcpTransportClient(TransportClient):
         """
         return location.startswith('tcp:')
 
-    def __init__(self, location: str) -> None:
+    def __init__(
+            self, location: str,
+            buffer_pool: Optional[TieredBufferPool] = None) -> None:
         """Create a TcpClient for a given location.
 
         The client will connect to this location and be able to request
         messages from any instance and port represented by it.
 
+        If a buffer pool is given, responses are received into buffers
+        taken from it rather than into newly allocated ones. In that
+        case, the response returned by :meth:`call` is only valid until
+        the next call to :meth:`call` or :meth:`close`, and must be
+        decoded or copied before then.
+
         Args:
             location: A location string for the peer.
+            buffer_pool: A pool to take receive buffers from.
+        """
+        self._buffer_pool = buffer_pool
+        self._buffer = None     # type: Optional[bytearray]
+        self._socket = self._open_socket(location)
+
+    def _open_socket(self, location: str) -> socket.SocketType:
+        """Connects to the server at the given location.
+
+        Subclasses for other kinds of stream sockets override this.
+
+        Args:
+            location: A location string for the peer.
+
+        Returns:
+            A connected socket.
+
+        Raises:
+            RuntimeError: If the server could not be reached.
         """
         addresses = location[4:].split(',')
 
@@ -42,14 +71,14 @@ class TcpTransportClient(TransportClient):
         if sock is None:
             raise RuntimeError('Could not connect to the server at location'
                                ' {}'.format(location))
-        else:
-            if hasattr(socket, "TCP_NODELAY"):
-                sock.setsockopt(socket.SOL_TCP, socket.TCP_NODELAY, 1)
-            if hasattr(socket, "TCP_QUICKACK"):
-                sock.setsockopt(socket.SOL_TCP, socket.TCP_QUICKACK, 1)
-            self._socket = sock
-
-    def call(self, request: bytes) -> bytes:
+
+        if hasattr(socket, "TCP_NODELAY"):
+            sock.setsockopt(socket.SOL_TCP, socket.TCP_NODELAY, 1)
+        if hasattr(socket, "TCP_QUICKACK"):
+            sock.setsockopt(socket.SOL_TCP, socket.TCP_QUICKACK, 1)
+        return sock
+
+    def call(self, request: bytes) -> Union[bytes, memoryview]:
         """Send a request to the server and receive the response.
 
         This is a blocking call.
@@ -58,13 +87,20 @@ class TcpTransportClient(TransportClient):
             request: The request to send
 
         Returns:
-            The received response
+            The received response. If this client has a buffer pool,
+            then this is only valid until the next call.
         """
-        send_int64(self._socket, len(request))
-        self._socket.sendall(request)
+        send_frame(self._socket, request)
 
         length = recv_int64(self._socket)
-        return recv_all(self._socket, length)
+        if self._buffer_pool is None:
+            return recv_all(self._socket, length)
+
+        self._release_buffer()
+        self._buffer = self._buffer_pool.get(length)
+        response = memoryview(self._buffer)[:length]
+        recv_all_into(self._socket, response)
+        return response
 
     def close(self) -> None:
         """Closes this client.
@@ -74,6 +110,14 @@ class TcpTransportClient(TransportClient):
         """
         self._socket.shutdown(socket.SHUT_RDWR)
         self._socket.close()
+        self._release_buffer()
+
+    def _release_buffer(self) -> None:
+        """Returns the last receive buffer to the pool, if any.
+        """
+        if self._buffer is not None:
+            cast(TieredBufferPool, self._buffer_pool).put(self._buffer)
+            self._buffer = None
 
     def _connect(self, address: str) -> socket.SocketType:
         loc_parts = address.rsplit(':', 1)
@@ -1,19 +1,23 @@
 import socket
 import socketserver as ss
 import threading
-from typing import cast, List, Optional, Tuple
+from typing import cast, List, Optional, Tuple, Union
 from typing_extensions import Type
 
 import netifaces
 
+from libmuscle.mcp.buffer_pool import TieredBufferPool
 from libmuscle.mcp.transport_server import RequestHandler, TransportServer
-from libmuscle.mcp.tcp_util import (recv_all, recv_int64, send_int64,
-                                    SocketClosed)
+from libmuscle.mcp.tcp_util import (recv_all, recv_all_into, recv_int64,
+                                    send_frame, SocketClosed)
 
 
 class TcpTransportServerImpl(ss.ThreadingMixIn, ss.TCPServer):
     daemon_threads = True
     allow_reuse_address = True
+    # All instances connect at about the same time at start-up, so allow
+    # for a longer queue of pending connections than the default of 5.
+    request_queue_size = 128
 
     def __init__(self, host_port_tuple: Tuple[str, int],
                  streamhandler: Type, transport_server: 'TcpTransportServer'
@@ -35,44 +39,82 @@ class TcpHandler(ss.BaseRequestHandler):
     def handle(self) -> None:
         """Handles requests on a socket
         """
+        self._buffer = None     # type: Optional[bytearray]
         request = self.receive_request()
 
         while request is not None:
             server = cast(TcpTransportServerImpl, self.server).transport_server
-            response = server._handler.handle_request(request)
+            try:
+                response = server._handler.handle_request(request)
 
-            send_int64(self.request, len(response))
-            self.request.sendall(response)
+                send_frame(self.request, response)
+            finally:
+                self.release_request()
             request = self.receive_request()
 
-    def receive_request(self) -> Optional[bytes]:
+    def receive_request(self) -> Optional[Union[bytes, memoryview]]:
         """Receives a request
 
+        If the server has a buffer pool, then the request is received
+        into a buffer from the pool, which must be returned using
+        :meth:`release_request` when the request has been handled. In
+        that case a view of the buffer is returned, and the request
+        handler must not keep a reference to it after it returns, as
+        the buffer will be reused for another request.
+
         Returns:
-            The received bytes
+            The received bytes, or None if the connection was closed
         """
+        buffer_pool = cast(
+                TcpTransportServerImpl, self.server
+                ).transport_server._buffer_pool
         try:
             length = recv_int64(self.request)
-            reqbuf = recv_all(self.request, length)
+            if buffer_pool is None:
+                return recv_all(self.request, length)
+
+            self._buffer = buffer_pool.get(length)
+            reqbuf = memoryview(self._buffer)[:length]
+            recv_all_into(self.request, reqbuf)
             return reqbuf
         except SocketClosed:
+            self.release_request()
             return None
 
+    def release_request(self) -> None:
+        """Returns the buffer of the last request to the pool, if any.
+        """
+        if self._buffer is not None:
+            buffer_pool = cast(
+                    TcpTransportServerImpl, self.server
+                    ).transport_server._buffer_pool
+            cast(TieredBufferPool, buffer_pool).put(self._buffer)
+            self._buffer = None
+
 
 class TcpTransportServer(TransportServer):
     """A TransportServer that uses TCP to communicate."""
-    def __init__(self, handler: RequestHandler, port: int = 0) -> None:
+    def __init__(
+            self, handler: RequestHandler, port: int = 0,
+            buffer_pool: Optional[TieredBufferPool] = None) -> None:
         """Create a TCPServer.
 
+        If a buffer pool is given, requests are received into buffers
+        taken from it rather than into newly allocated ones. In that
+        case, the handler must not keep a reference to the request
+        after it returns.
+
         Args:
             handler: A RequestHandler to handle requests
             port: The port to use.
+            buffer_pool: A pool to take receive buffers from.
 
         Raises:
             OSError: With errno set to errno.EADDRINUSE if the port is not
                 available.
         """
         super().__init__(handler)
+        self._buffer_pool = buffer_pool
 
         self._server = TcpTransportServerImpl(('', port), TcpHandler, self)
         self._server_thread = threading.Thread(
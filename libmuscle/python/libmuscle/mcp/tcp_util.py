@@ -19,11 +19,25 @@ def recv_all(socket: SocketType, length: int) -> bytes:
         RuntimeError: If a read error occurred.
     """
     databuf = bytearray(length)
+    recv_all_into(socket, memoryview(databuf))
+    return databuf
+
+
+def recv_all_into(socket: SocketType, buf: memoryview) -> None:
+    """Receive bytes from a socket until a buffer is full.
+
+    Args:
+        socket: Socket to receive on.
+        buf: Buffer to receive into, all of which will be filled.
+
+    Raises:
+        SocketClosed: If the socket was closed by the peer.
+        RuntimeError: If a read error occurred.
+    """
+    length = len(buf)
     received_count = 0
     while received_count < length:
-        bytes_left = length - received_count
-        received_now = socket.recv_into(
-            memoryview(databuf)[received_count:], bytes_left)
+        received_now = socket.recv_into(buf[received_count:])
 
         if received_now == 0:
             raise SocketClosed("Socket closed while receiving")
@@ -33,8 +47,6 @@ def recv_all(socket: SocketType, length: int) -> bytes:
 
         received_count += received_now
 
-    return databuf
-
 
 def send_int64(socket: SocketType, data: int) -> None:
     """Sends an int as a 64-bit signed little endian number.
@@ -50,6 +62,32 @@ def send_int64(socket: SocketType, data: int) -> None:
     socket.sendall(buf)
 
 
+def send_frame(socket: SocketType, data: bytes) -> None:
+    """Sends a frame of data, preceded by its length.
+
+    The length is sent as with :func:`send_int64`. The length and the
+    data are passed to the kernel together using scatter-gather I/O,
+    so that they go out in a single system call without first being
+    copied into a single buffer.
+
+    Args:
+        socket: The socket to send on.
+        data: The data to send.
+
+    Raises:
+        RuntimeError: If there was an error sending the data.
+    """
+    length = len(data).to_bytes(8, byteorder='little')
+    sent = socket.sendmsg([length, data])
+
+    # sendmsg may send only part of it, in which case we send the rest
+    if sent < len(length):
+        socket.sendall(length[sent:])
+        sent = len(length)
+    if sent - len(length) < len(data):
+        socket.sendall(memoryview(data)[sent - len(length):])
+
+
 def recv_int64(socket: SocketType) -> int:
     """Receives an int as a 64-bit signed little endian number.
 
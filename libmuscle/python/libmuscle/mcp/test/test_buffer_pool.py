@@ -0,0 +1,27 @@
+from libmuscle.mcp.buffer_pool import TieredBufferPool
+
+
+def test_get_sizes() -> None:
+    pool = TieredBufferPool([16, 64])
+
+    assert len(pool.get(0)) == 16
+    assert len(pool.get(16)) == 16
+    assert len(pool.get(17)) == 64
+    assert len(pool.get(100)) == 100
+
+
+def test_reuse() -> None:
+    pool = TieredBufferPool([16, 64], 1)
+
+    buf1 = pool.get(10)
+    buf2 = pool.get(10)
+    assert buf1 is not buf2
+
+    pool.put(buf1)
+    pool.put(buf2)
+    assert pool.get(12) is buf1
+    assert pool.get(12) is not buf2
+
+    big = pool.get(100)
+    pool.put(big)
+    assert pool.get(100) is not big
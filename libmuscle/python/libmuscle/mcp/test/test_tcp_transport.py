@@ -1,5 +1,6 @@
 from unittest.mock import MagicMock
 
+from libmuscle.mcp.buffer_pool import TieredBufferPool
 from libmuscle.mcp.tcp_transport_client import TcpTransportClient
 from libmuscle.mcp.tcp_transport_server import TcpTransportServer
 
@@ -28,3 +29,60 @@ def test_tcp_transport():
 
     client.close()
     server.close()
+
+
+def test_tcp_transport_buffer_pool():
+    responses = [b'response', b'second response']
+
+    def handle_request(request: bytes) -> bytes:
+        return responses[int(request)]
+
+    handler = MagicMock()
+    handler.handle_request = handle_request
+
+    server = TcpTransportServer(handler)
+    pool = TieredBufferPool([16])
+    client = TcpTransportClient(server.get_location(), pool)
+
+    assert client.call(b'0') == b'response'
+    assert client.call(b'1') == b'second response'
+    assert client.call(b'0') == b'response'
+
+    client.close()
+    server.close()
+
+
+def test_tcp_transport_server_buffer_pool():
+    def handle_request(request: bytes) -> bytes:
+        return b'response to ' + bytes(request)
+
+    handler = MagicMock()
+    handler.handle_request = handle_request
+
+    server = TcpTransportServer(handler, buffer_pool=TieredBufferPool([16]))
+    client = TcpTransportClient(server.get_location())
+
+    assert client.call(b'long request') == b'response to long request'
+    assert client.call(b'short') == b'response to short'
+    assert client.call(b'a' * 20) == b'response to ' + b'a' * 20
+
+    client.close()
+    server.close()
+
+
+def test_tcp_transport_large_messages():
+    def handle_request(request: bytes) -> bytes:
+        return bytes(request) * 2
+
+    handler = MagicMock()
+    handler.handle_request = handle_request
+
+    server = TcpTransportServer(handler)
+    client = TcpTransportClient(server.get_location())
+
+    for size in (0, 1 << 16, (1 << 16) + 1, 1 << 20):
+        request = bytes(range(256)) * (size // 256) + b'x' * (size % 256)
+        assert client.call(request) == request * 2
+
+    client.close()
+    server.close()
@@ -0,0 +1,29 @@
+from unittest.mock import MagicMock
+
+from libmuscle.mcp.tcp_util import send_frame
+
+
+def test_send_frame():
+    sock = MagicMock()
+    sock.sendmsg.return_value = 13
+
+    send_frame(sock, b'frame')
+    sock.sendmsg.assert_called_once_with([b'\x05' + bytes(7), b'frame'])
+    sock.sendall.assert_not_called()
+
+
+def test_send_frame_partial():
+    sock = MagicMock()
+    sock.sendmsg.return_value = 10
+
+    send_frame(sock, b'frame')
+    sock.sendall.assert_called_once()
+    assert bytes(sock.sendall.call_args[0][0]) == b'ame'
+
+    sock.reset_mock()
+    sock.sendmsg.return_value = 3
+
+    send_frame(sock, b'frame')
+    assert sock.sendall.call_count == 2
+    assert sock.sendall.call_args_list[0][0][0] == bytes(5)
+    assert bytes(sock.sendall.call_args_list[1][0][0]) == b'frame'
@@ -0,0 +1,62 @@
+import os
+import subprocess
+import sys
+from unittest.mock import MagicMock
+
+import pytest
+
+from libmuscle.mcp.tcp_transport_client import TcpTransportClient
+from libmuscle.mcp.unix_transport_client import UnixTransportClient
+from libmuscle.mcp.unix_transport_server import UnixTransportServer
+
+
+def test_unix_transport():
+    request = b'request'
+    response = b'response'
+
+    def handle_request(request: bytes) -> bytes:
+        assert request == b'request'
+        return response
+
+    handler = MagicMock()
+    handler.handle_request = handle_request
+
+    server = UnixTransportServer(handler)
+
+    server_location = server.get_location()
+    assert UnixTransportClient.can_connect_to(server_location)
+    assert not TcpTransportClient.can_connect_to(server_location)
+    client = UnixTransportClient(server_location)
+
+    response2 = client.call(request)
+    assert response == response2
+
+    client.close()
+    server.close()
+    assert not os.path.exists(server_location[5:])
+
+
+def test_unix_transport_no_server():
+    server = UnixTransportServer(MagicMock())
+    location = server.get_location()
+    server.close()
+
+    with pytest.raises(RuntimeError):
+        UnixTransportClient(location)
+
+
+def test_unix_transport_socket_file_removed_at_exit():
+    script = (
+            'from unittest.mock import MagicMock\n'
+            'from libmuscle.mcp.unix_transport_server import'
+            ' UnixTransportServer\n'
+            'server = UnixTransportServer(MagicMock())\n'
+            'print(server.get_location())\n'
+            'raise RuntimeError("crash")\n')
+    result = subprocess.run(
+            [sys.executable, '-c', script], stdout=subprocess.PIPE,
+            stderr=subprocess.DEVNULL, universal_newlines=True)
+    assert result.returncode != 0
+    location = result.stdout.strip()
+    assert location.startswith('unix:')
+    assert not os.path.exists(location[5:])
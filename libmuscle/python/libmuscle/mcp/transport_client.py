@@ -1,3 +1,6 @@
+from typing import Union
+
+
 class TransportClient:
     """A client that connects to an MCP server.
 
@@ -17,7 +20,7 @@ class TransportClient:
         """
         raise NotImplementedError()     # pragma: no cover
 
-    def call(self, request: bytes) -> bytes:
+    def call(self, request: bytes) -> Union[bytes, memoryview]:
         """Send a request to the server and receive the response.
 
         This is a blocking call.
@@ -26,7 +29,10 @@ class TransportClient:
             request: The request to send
 
         Returns:
-            The received response
+            The received response. Implementations may return a
+            memoryview into a buffer that they reuse, which is only
+            valid until the next call to :meth:`call` or
+            :meth:`close`, so decode or copy the response before then.
         """
         raise NotImplementedError()     # pragma: no cover
 
@@ -10,7 +10,9 @@ class RequestHandler:
         """Handle a request.
 
         Args:
-            request: A received request
+            request: A received request. This may be a view of a
+                    reused buffer, so it must not be kept after this
+                    function returns.
 
         Returns:
             An encoded response
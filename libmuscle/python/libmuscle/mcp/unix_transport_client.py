@@ -0,0 +1,44 @@
+import socket
+
+from libmuscle.mcp.tcp_transport_client import TcpTransportClient
+
+
+class UnixTransportClient(TcpTransportClient):
+    """A client that connects to a UnixTransport server.
+
+    Framing is the same as for TCP, so this only differs from
+    :class:`TcpTransportClient` in how it connects. Connecting only
+    succeeds if the server is on the same machine.
+    """
+    @staticmethod
+    def can_connect_to(location: str) -> bool:
+        """Whether this client class can connect to the given location.
+
+        Args:
+            location: The location to potentially connect to.
+
+        Returns:
+            True iff this class can connect to this location.
+        """
+        return location.startswith('unix:')
+
+    def _open_socket(self, location: str) -> socket.SocketType:
+        """Connects to the server at the given location.
+
+        Args:
+            location: A location string for the peer.
+
+        Returns:
+            A connected socket.
+
+        Raises:
+            RuntimeError: If the server could not be reached.
+        """
+        sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        try:
+            sock.connect(location[5:])
+        except OSError:
+            sock.close()
+            raise RuntimeError('Could not connect to the server at location'
+                               ' {}'.format(location))
+        return sock
@@ -0,0 +1,100 @@
+import atexit
+import os
+import socketserver as ss
+import tempfile
+import threading
+from typing import Optional
+from typing_extensions import Type
+import uuid
+
+from libmuscle.mcp.buffer_pool import TieredBufferPool
+from libmuscle.mcp.tcp_transport_server import TcpHandler
+from libmuscle.mcp.transport_server import (
+        RequestHandler, ServerNotSupported, TransportServer)
+
+
+class UnixTransportServerImpl(ss.ThreadingMixIn, ss.UnixStreamServer):
+    daemon_threads = True
+    request_queue_size = 128
+
+    def __init__(self, path: str, streamhandler: Type,
+                 transport_server: 'UnixTransportServer') -> None:
+        super().__init__(path, streamhandler)
+        self.transport_server = transport_server
+
+
+class UnixTransportServer(TransportServer):
+    """A TransportServer that uses Unix domain sockets.
+
+    This only accepts connections from the same machine, but avoids the
+    overhead of the TCP/IP stack for those. Framing is the same as for
+    :class:`TcpTransportServer`, and the connections are handled by the
+    same :class:`TcpHandler`.
+    """
+    def __init__(
+            self, handler: RequestHandler,
+            buffer_pool: Optional[TieredBufferPool] = None) -> None:
+        """Create a UnixTransportServer.
+
+        The socket is created in the system's temporary directory,
+        with a unique name. The socket file is removed when the server
+        is closed, or when the process exits if that happens first.
+
+        Args:
+            handler: A RequestHandler to handle requests
+            buffer_pool: A pool to take receive buffers from, see
+                :class:`TcpTransportServer`.
+
+        Raises:
+            ServerNotSupported: If no socket could be created, e.g.
+                because the path to the temporary directory is too
+                long.
+        """
+        super().__init__(handler)
+        self._buffer_pool = buffer_pool
+
+        self._path = os.path.join(
+                tempfile.gettempdir(),
+                'muscle3_{}.sock'.format(uuid.uuid4().hex))
+        try:
+            self._server = UnixTransportServerImpl(
+                    self._path, TcpHandler, self)
+        except OSError as e:
+            raise ServerNotSupported(
+                    'Could not create Unix domain socket: {}'.format(e))
+
+        # If the instance crashes or shuts down because of an error, close()
+        # may never be called, so make sure we don't leave the file behind.
+        atexit.register(self._remove_socket_file)
+
+        self._server_thread = threading.Thread(
+                target=self._server.serve_forever, args=(0.1,), daemon=True)
+        self._server_thread.start()
+
+    def get_location(self) -> str:
+        """Returns the location this server listens on.
+
+        Returns:
+            A string containing the location.
+        """
+        return 'unix:{}'.format(self._path)
+
+    def close(self) -> None:
+        """Closes this server.
+
+        Stops the server listening, waits for existing clients to
+        disconnect, then frees any other resources.
+        """
+        self._server.shutdown()
+        self._server_thread.join()
+        self._server.server_close()
+        self._remove_socket_file()
+        atexit.unregister(self._remove_socket_file)
+
+    def _remove_socket_file(self) -> None:
+        """Removes the socket file, if it still exists.
+        """
+        try:
+            os.unlink(self._path)
+        except FileNotFoundError:
+            pass
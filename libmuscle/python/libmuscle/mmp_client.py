@@ -1,6 +1,9 @@
 import dataclasses
+from itertools import count
+import os
 from pathlib import Path
 from random import uniform
+from threading import Lock
 from time import perf_counter, sleep
 from typing import Any, Dict, Iterable, List, Optional, Tuple
 
@@ -10,6 +13,7 @@ from ymmsl import (
         CheckpointRule, CheckpointRangeRule, CheckpointAtRule)
 
 import libmuscle
+from libmuscle.mcp.buffer_pool import TieredBufferPool
 from libmuscle.mcp.protocol import RequestType, ResponseType
 from libmuscle.mcp.tcp_transport_client import TcpTransportClient
 from libmuscle.profiling import ProfileEvent
@@ -21,6 +25,7 @@ CONNECTION_TIMEOUT = 300
 PEER_TIMEOUT = 600
 PEER_INTERVAL_MIN = 5.0
 PEER_INTERVAL_MAX = 10.0
+NUM_CONNECTIONS = 2
 
 _CheckpointInfoType = Tuple[
         float, Checkpoints, Optional[Path], Optional[Path]]
@@ -103,13 +108,37 @@ class MMPClient():
     It manages the connection, and converts between our native types
     and the gRPC generated types.
     """
-    def __init__(self, location: str) -> None:
+    def __init__(
+            self, location: str, num_connections: Optional[int] = None
+            ) -> None:
         """Create an MMPClient
 
+        The client is used by the profiler, the log handler and the
+        snapshot writer, which may call from different threads. To
+        avoid these having to wait for each other, it makes several
+        connections to the manager and spreads calls over them.
+
         Args:
             location: A connection string of the form hostname:port
+            num_connections: Number of connections to make. If not
+                given, this is taken from the MUSCLE_MANAGER_CONNECTIONS
+                environment variable, or NUM_CONNECTIONS if that is not
+                set.
         """
-        self._transport_client = TcpTransportClient(location)
+        if num_connections is None:
+            num_connections = int(os.environ.get(
+                    'MUSCLE_MANAGER_CONNECTIONS', NUM_CONNECTIONS))
+        if num_connections < 1:
+            raise RuntimeError(
+                    'The number of connections to the manager must be at'
+                    f' least 1, but {num_connections} was specified.')
+
+        buffer_pool = TieredBufferPool()
+        self._transport_clients = [
+                TcpTransportClient(location, buffer_pool)
+                for _ in range(num_connections)]
+        self._mutexes = [Lock() for _ in range(num_connections)]
+        self._next_connection = count()
 
     def close(self) -> None:
         """Close the connection
@@ -117,7 +146,8 @@ class MMPClient():
         This closes the connection. After this no other member
         functions can be called.
         """
-        self._transport_client.close()
+        for transport_client in self._transport_clients:
+            transport_client.close()
 
     def submit_log_message(self, message: LogMessage) -> None:
         """Send a log message to the manager.
@@ -200,6 +230,49 @@ class MMPClient():
             raise RuntimeError(
                     f'Error registering instance: {response[1]}')
 
+    def register_and_connect(
+            self, name: Reference, locations: List[str], ports: List[Port]
+            ) -> Tuple[
+                    List[Conduit],
+                    Dict[Reference, List[int]],
+                    Dict[Reference, List[str]],
+                    Settings]:
+        """Register and get peers and settings in one go.
+
+        This does the same as :meth:`register_instance` followed by
+        :meth:`request_peers` and :meth:`get_settings`, but in a
+        single round trip if the peers are available already.
+
+        Args:
+            name: Name of the instance in the simulation.
+            locations: List of places where the instance can be
+                    reached.
+            ports: List of ports of this instance.
+
+        Returns:
+            The conduits, peer dimensions and peer locations as returned
+            by :meth:`request_peers`, and the settings.
+        """
+        request = [
+                RequestType.REGISTER_AND_CONNECT.value,
+                str(name), locations,
+                [encode_port(p) for p in ports],
+                libmuscle.__version__]
+        response = self._call_manager(request)
+        if response[0] == ResponseType.ERROR.value:
+            raise RuntimeError(
+                    f'Error registering instance: {response[1]}')
+
+        if response[0] == ResponseType.PENDING.value:
+            # We're registered, but have to wait for our peers
+            conduits, peer_dims, peer_locations = self.request_peers(name)
+            settings = self.get_settings()
+        else:
+            conduits, peer_dims, peer_locations = self._decode_peers(response)
+            settings = Settings(response[4])
+
+        return conduits, peer_dims, peer_locations, settings
+
     def request_peers(
             self, name: Reference) -> Tuple[
                     List[Conduit],
@@ -249,6 +322,23 @@ class MMPClient():
             raise RuntimeError('Error getting peers from manager: {}'.format(
                     response[1]))
 
+        return self._decode_peers(response)
+
+    def _decode_peers(
+            self, response: Any) -> Tuple[
+                    List[Conduit],
+                    Dict[Reference, List[int]],
+                    Dict[Reference, List[str]]]:
+        """Decode the peer information in a manager response.
+
+        Args:
+            response: A successful GET_PEERS or REGISTER_AND_CONNECT
+                    response.
+
+        Returns:
+            The conduits, peer dimensions and peer locations, see
+            :meth:`request_peers`.
+        """
         conduits = [Conduit(snd, recv) for snd, recv in response[1]]
 
         peer_dimensions = {
@@ -284,5 +374,8 @@ class MMPClient():
             The decoded response
         """
         encoded_request = msgpack.packb(request, use_bin_type=True)
-        response = self._transport_client.call(encoded_request)
-        return msgpack.unpackb(response, raw=False)
+        i = next(self._next_connection) % len(self._transport_clients)
+        with self._mutexes[i]:
+            # the response buffer is reused, so decode before releasing
+            response = self._transport_clients[i].call(encoded_request)
+            return msgpack.unpackb(response, raw=False)
@@ -1,3 +1,4 @@
+from threading import Lock
 from typing import List, Optional
 
 import msgpack
@@ -39,6 +40,8 @@ class MPPClient:
             raise RuntimeError('Failed to connect')
 
         self._transport_client = client
+        # Communicator may receive from several threads at once
+        self._mutex = Lock()
 
     def receive(self, receiver: Reference) -> bytes:
         """Receive a message from a port this client connects to.
@@ -51,7 +54,8 @@ class MPPClient:
         """
         request = [RequestType.GET_NEXT_MESSAGE.value, str(receiver)]
         encoded_request = msgpack.packb(request, use_bin_type=True)
-        return self._transport_client.call(encoded_request)
+        with self._mutex:
+            return self._transport_client.call(encoded_request)
 
     def close(self) -> None:
         """Closes this client.
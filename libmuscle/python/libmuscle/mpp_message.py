@@ -72,7 +72,9 @@ def _encode_grid(grid: Grid) -> msgpack.ExtType:
     if array_type not in ext_type_map:
         raise RuntimeError('Unsupported array data type')
 
-    buf = array.tobytes(order='A')
+    # For contiguous arrays, this is a view on the array's memory rather
+    # than a copy, and msgpack will copy from it directly into its output.
+    buf = array.ravel(order='A').data
 
     # array_type is redundant, but useful metadata.
     grid_dict = {
@@ -111,6 +113,14 @@ def _decode_grid(code: int, data: bytes) -> Grid:
     return Grid(array, indexes)
 
 
+# The MessagePack map header of an encoded MPPMessage, which has nine fields,
+# and the encoded key of the data field, for when the data is encoded
+# separately. Eight remaining fields also fit in a fixmap, which has its
+# length in its first byte.
+_FULL_MAP_HEADER = bytes([0x89])
+_DATA_KEY = msgpack.packb('data', use_bin_type=True)
+
+
 def _data_encoder(obj: Any) -> Any:
     """Encodes custom objects for MessagePack.
 
@@ -148,6 +158,13 @@ class MPPMessage:
     they can be routed by a MUSCLE Transport Overlay when we get to
     multi-site running in the future.
     """
+    # One of these is made for every message sent or received, so save
+    # some memory and time by not giving each one a __dict__.
+    __slots__ = (
+            'sender', 'receiver', 'port_length', 'timestamp',
+            'next_timestamp', 'settings_overlay', 'message_number',
+            'saved_until', 'data')
+
     def __init__(self, sender: Reference, receiver: Reference,
                  port_length: Optional[int],
                  timestamp: float, next_timestamp: Optional[float],
@@ -216,8 +233,32 @@ class MPPMessage:
                 sender, receiver, port_length, timestamp, next_timestamp,
                 settings_overlay, message_number, saved_until, data)
 
-    def encoded(self) -> bytes:
+    @staticmethod
+    def encode_data(data: Any) -> bytes:
+        """Encode message data separately.
+
+        The result can be passed to :meth:`encoded` to encode several
+        messages with the same data without encoding the data again
+        for each of them.
+
+        Args:
+            data: The data to encode.
+
+        Returns:
+            The MessagePack-encoded data.
+        """
+        if isinstance(data, np.ndarray):
+            data = Grid(data)
+        return cast(bytes, msgpack.packb(
+            data, default=_data_encoder, use_bin_type=True))
+
+    def encoded(self, encoded_data: Optional[bytes] = None) -> bytes:
         """Encode the message and return as a bytes buffer.
+
+        Args:
+            encoded_data: The message data as encoded by
+                :meth:`encode_data`, if available. If not given,
+                self.data is encoded.
         """
         message_dict = {
                 'sender': str(self.sender),
@@ -231,5 +272,14 @@ class MPPMessage:
                 'data': self.data
                 }
 
-        return cast(bytes, msgpack.packb(
-            message_dict, default=_data_encoder, use_bin_type=True))
+        if encoded_data is None:
+            return cast(bytes, msgpack.packb(
+                message_dict, default=_data_encoder, use_bin_type=True))
+
+        # Encode the rest of the message as a map, then extend that map
+        # with the data item, whose value has already been encoded.
+        del message_dict['data']
+        header = msgpack.packb(
+                message_dict, default=_data_encoder, use_bin_type=True)
+        return b''.join((
+                _FULL_MAP_HEADER, header[1:], _DATA_KEY, encoded_data))
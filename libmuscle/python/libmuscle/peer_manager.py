@@ -30,25 +30,28 @@ class PeerManager:
             peer_locations: A list of locations for each peer instance
                     we share a conduit with.
         """
-        self.__kernel = kernel
         self.__index = index
 
-        # peer port ids, indexed by local kernel.port id
-        self.__peers = dict()  # type: Dict[Reference, List[Reference]]
+        # peer port ids, indexed by local port name. These are looked up
+        # for every message, and a plain str hashes much faster than a
+        # kernel.port Reference, which would need to be built first.
+        self.__peers = dict()  # type: Dict[str, List[Reference]]
 
         for conduit in conduits:
             if str(conduit.sending_component()) == str(kernel):
                 # we send on the port this conduit attaches to
                 self.__peers.setdefault(
-                        conduit.sender, []).append(conduit.receiver)
+                        str(conduit.sending_port()), []).append(
+                                conduit.receiver)
             if str(conduit.receiving_component()) == str(kernel):
                 # we receive on the port this conduit attaches to
-                if conduit.receiver in self.__peers:
+                recv_port = str(conduit.receiving_port())
+                if recv_port in self.__peers:
                     raise RuntimeError(('Receiving port "{}" is connected by'
                                         ' multiple conduits, but at most one'
                                         ' is allowed.'
                                         ).format(conduit.receiving_port()))
-                self.__peers[conduit.receiver] = [conduit.sender]
+                self.__peers[recv_port] = [conduit.sender]
 
         self.__peer_dims = peer_dims    # indexed by kernel id
         self.__peer_locations = peer_locations  # indexed by instance id
@@ -59,8 +62,7 @@ class PeerManager:
         Args:
             port: The port to check.
         """
-        recv_port_full = self.__kernel + port
-        return recv_port_full in self.__peers
+        return str(port) in self.__peers
 
     def get_peer_ports(self, port: Identifier) -> List[Reference]:
         """Get a reference for the peer ports.
@@ -68,7 +70,7 @@ class PeerManager:
         Args:
             port: Name of the port on this side.
         """
-        return self.__peers[self.__kernel + port]
+        return self.__peers[str(port)]
 
     def get_peer_dims(self, peer_kernel: Reference) -> List[int]:
         """Get the dimensions of a peer kernel.
@@ -100,7 +102,7 @@ class PeerManager:
         Returns:
             The peer endpoints.
         """
-        peers = self.__peers[self.__kernel + port]
+        peers = self.__peers[str(port)]
         endpoints = []
 
         for peer in peers:
@@ -388,7 +388,7 @@ class Resources:
 
     def total_cores(self) -> int:
         """Returns the total number of cores designated."""
-        return sum([len(cs) for cs in self.cores.values()])
+        return sum(len(cs) for cs in self.cores.values())
 
     def isdisjoint(self, other: 'Resources') -> bool:
         """Returns whether we share resources with other."""
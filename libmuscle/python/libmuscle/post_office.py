@@ -19,7 +19,9 @@ class PostOffice(RequestHandler):
     def __init__(self) -> None:
         """Create a PostOffice.
         """
-        self._outboxes = dict()  # type: Dict[Reference, Outbox]
+        # indexed by str(receiver), so that incoming requests can be
+        # routed without parsing the receiver into a Reference first
+        self._outboxes = dict()  # type: Dict[str, Outbox]
 
         self._outbox_lock = Lock()
 
@@ -39,9 +41,7 @@ class PostOffice(RequestHandler):
         if len(req) != 2 or req[0] != RequestType.GET_NEXT_MESSAGE.value:
             raise RuntimeError(
                     'Invalid request type. Did the streams get crossed?')
-        recv_port = Reference(req[1])
-        self._ensure_outbox_exists(recv_port)
-        return self._outboxes[recv_port].retrieve()
+        return self._get_outbox(req[1]).retrieve()
 
     def get_message(self, receiver: Reference) -> bytes:
         """Get a message from a receiver's outbox.
@@ -52,8 +52,7 @@ class PostOffice(RequestHandler):
         Args:
             receiver: The receiver of the message.
         """
-        self._ensure_outbox_exists(receiver)
-        return self._outboxes[receiver].retrieve()
+        return self._get_outbox(str(receiver)).retrieve()
 
     def deposit(self, receiver: Reference, message: bytes) -> None:
         """Deposits a message into an outbox.
@@ -62,8 +61,7 @@ class PostOffice(RequestHandler):
             receiver: Receiver of the message.
             message: The message to deposit.
         """
-        self._ensure_outbox_exists(receiver)
-        self._outboxes[receiver].deposit(message)
+        self._get_outbox(str(receiver)).deposit(message)
 
     def wait_for_receivers(self) -> None:
         """Waits until all outboxes are empty.
@@ -72,17 +70,18 @@ class PostOffice(RequestHandler):
             while not outbox.is_empty():
                 time.sleep(0.1)
 
-    def _ensure_outbox_exists(self, receiver: Reference) -> None:
-        """Ensure that an outbox exists.
+    def _get_outbox(self, receiver: str) -> Outbox:
+        """Get the outbox for a receiver, creating it if needed.
 
         Outboxes are created dynamically, the first time a message is
-        sent to a receiver. This function checks that an outbox exists
-        for a receiver, and if not, creates one.
+        sent to or requested by a receiver. Once an outbox exists, it
+        is returned without taking the lock.
 
         Args:
-            receiver: The receiver that should have an outbox.
+            receiver: The receiver whose outbox to get, as a string.
         """
-        self._outbox_lock.acquire()
-        if receiver not in self._outboxes:
-            self._outboxes[receiver] = Outbox()
-        self._outbox_lock.release()
+        outbox = self._outboxes.get(receiver)
+        if outbox is None:
+            with self._outbox_lock:
+                outbox = self._outboxes.setdefault(receiver, Outbox())
+        return outbox
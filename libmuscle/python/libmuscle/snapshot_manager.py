@@ -1,5 +1,9 @@
+from dataclasses import dataclass
 import logging
+import os
 from pathlib import Path
+from queue import Queue
+from threading import Thread
 from typing import cast, List, Optional
 
 from ymmsl import Reference, Operator, Settings
@@ -18,6 +22,126 @@ _NO_MESSAGE_PROVIDED = (
         ' store the state of the instance in a snapshot.')
 
 
+_MAX_QUEUED_SNAPSHOTS = 2
+
+
+@dataclass
+class _PendingSnapshot:
+    """A serialised snapshot waiting to be written by the _SnapshotWriter.
+    """
+    path: Path
+    version: bytes
+    data: bytes
+    metadata: SnapshotMetadata
+
+
+class _SnapshotWriter(Thread):
+    """Writes snapshots to disk in a background thread.
+
+    Snapshots are serialised by the caller, and handed to this thread
+    for writing and for submitting their metadata to the manager, so
+    that the model can continue while the data goes to disk.
+
+    Every snapshot is written, in order, since the manager needs all of
+    them to find consistent checkpoints across the workflow. If the
+    model saves snapshots faster than they can be written, then
+    :meth:`write` blocks until there is room in the queue again.
+
+    This is a daemon thread, so that it cannot keep a crashed model
+    from exiting. Snapshots that are still queued when the process
+    exits without the instance having been shut down are lost.
+    """
+    def __init__(self, instance_id: Reference, manager: MMPClient) -> None:
+        """Create a _SnapshotWriter.
+
+        Args:
+            instance_id: The id of the instance whose snapshots we write.
+            manager: The client used to submit metadata to the manager.
+        """
+        super().__init__(name='SnapshotWriter', daemon=True)
+        self._instance_id = instance_id
+        self._manager = manager
+
+        self._queue = Queue(
+                maxsize=_MAX_QUEUED_SNAPSHOTS
+                )  # type: Queue[Optional[_PendingSnapshot]]
+        self._error = None  # type: Optional[Exception]
+
+    def write(self, snapshot: _PendingSnapshot) -> None:
+        """Queue a snapshot for writing.
+
+        Args:
+            snapshot: The snapshot to write.
+
+        Raises:
+            RuntimeError: If writing an earlier snapshot failed.
+        """
+        self._check_error()
+        self._queue.put(snapshot)
+
+    def flush(self) -> None:
+        """Wait until all queued snapshots have been written.
+
+        Raises:
+            RuntimeError: If writing a snapshot failed.
+        """
+        self._queue.join()
+        self._check_error()
+
+    def shutdown(self) -> None:
+        """Write any queued snapshot, then stop the thread.
+        """
+        self._queue.put(None)
+        self.join()
+        self._check_error()
+
+    def run(self) -> None:
+        """Code executed in a separate thread
+        """
+        while True:
+            snapshot = self._queue.get()
+            try:
+                if snapshot is None:
+                    return
+                _write_snapshot_file(
+                        snapshot.path, snapshot.version, snapshot.data)
+                self._manager.submit_snapshot_metadata(
+                        self._instance_id, snapshot.metadata)
+            except Exception as e:
+                self._error = e
+            finally:
+                self._queue.task_done()
+
+    def _check_error(self) -> None:
+        """Raises if writing a snapshot failed in the background.
+        """
+        if self._error is not None:
+            error, self._error = self._error, None
+            raise RuntimeError(f'Failed to save snapshot: {error}') from error
+
+
+def _write_snapshot_file(path: Path, version: bytes, data: bytes) -> None:
+    """Write a serialised snapshot to disk.
+
+    The versioning byte is written separately, so that we don't have
+    to make a copy of the (potentially large) snapshot data to prepend
+    it.
+
+    Args:
+        path: Path to write to, must not exist yet.
+        version: The versioning byte of the snapshot format.
+        data: Snapshot data, excluding the versioning byte.
+    """
+    # Opening with mode 'x' since a file with the same name may be created
+    # in the small window between choosing the name and opening here. It is
+    # better to fail with an error than to overwrite an existing file.
+    with path.open('xb') as snapshot_file:
+        snapshot_file.write(version)
+        snapshot_file.write(data)
+        snapshot_file.flush()
+        os.fsync(snapshot_file.fileno())
+
+
 class SnapshotManager:
     """Manages information on snapshots for the Instance
 
@@ -47,6 +171,8 @@ class SnapshotManager:
         self._resume_overlay = Settings()
         self._next_snapshot_num = 1
 
+        self._writer = None     # type: Optional[_SnapshotWriter]
+
     def prepare_resume(
             self, resume_snapshot: Optional[Path],
             snapshot_directory: Optional[Path]) -> Optional[float]:
@@ -119,6 +245,10 @@ class SnapshotManager:
             ) -> float:
         """Save a (final) snapshot.
 
+        The snapshot is serialised immediately, but written to disk and
+        submitted to the manager in the background. Use :meth:`flush`
+        to wait for this to complete.
+
         Args:
             msg: Message object representing the snapshot.
             final: True iff called from save_final_snapshot.
@@ -135,7 +265,7 @@ class SnapshotManager:
             # pre-received, but not yet processed by the user code. Therefore,
             # the snapshot state should treat these as not-received.
             all_ports = self._communicator.list_ports()
-            ports = all_ports.get(Operator.F_INIT, [])
+            ports = all_ports.get(Operator.F_INIT, []).copy()
             if self._communicator.settings_in_connected():
                 ports.append('muscle_settings_in')
             for port_name in ports:
@@ -146,9 +276,15 @@ class SnapshotManager:
                 triggers, wallclock_time, port_message_counts, final, msg,
                 settings_overlay)
 
-        path = self.__store_snapshot(snapshot)
+        path = self.__next_snapshot_path()
+        data = snapshot.to_bytes()
         metadata = SnapshotMetadata.from_snapshot(snapshot, str(path))
-        self._manager.submit_snapshot_metadata(self._instance_id, metadata)
+
+        if self._writer is None:
+            self._writer = _SnapshotWriter(self._instance_id, self._manager)
+            self._writer.start()
+        self._writer.write(_PendingSnapshot(
+                path, snapshot.SNAPSHOT_VERSION_BYTE, data, metadata))
 
         timestamp = msg.timestamp if msg is not None else float('-inf')
         if final and f_init_max_timestamp is not None:
@@ -157,6 +293,25 @@ class SnapshotManager:
             timestamp = f_init_max_timestamp
         return timestamp
 
+    def flush(self) -> None:
+        """Wait until all saved snapshots have been written.
+
+        Raises:
+            RuntimeError: If writing a snapshot failed.
+        """
+        if self._writer is not None:
+            self._writer.flush()
+
+    def shutdown(self) -> None:
+        """Write any remaining snapshots and stop the background writer.
+
+        Raises:
+            RuntimeError: If writing a snapshot failed.
+        """
+        if self._writer is not None:
+            writer, self._writer = self._writer, None
+            writer.shutdown()
+
     @staticmethod
     def load_snapshot_from_file(snapshot_location: Path) -> Snapshot:
         """Load a previously stored snapshot from the filesystem
@@ -192,6 +347,17 @@ class SnapshotManager:
         Returns:
             Path where the snapshot is stored
         """
+        fpath = self.__next_snapshot_path()
+        _write_snapshot_file(
+                fpath, snapshot.SNAPSHOT_VERSION_BYTE, snapshot.to_bytes())
+        return fpath
+
+    def __next_snapshot_path(self) -> Path:
+        """Choose an available file name for the next snapshot
+
+        Returns:
+            Path where the next snapshot should be stored
+        """
         _logger.debug(f'Saving snapshot to {self._snapshot_directory}')
         for _ in range(_MAX_FILE_EXISTS_CHECK):
             # Expectation is that muscle_snapshot_directory is empty initially
@@ -206,10 +372,4 @@ class SnapshotManager:
             raise RuntimeError('Could not find an available filename for'
                                f' storing the next snapshot: {fpath} already'
                                ' exists.')
-        # Opening with mode 'x' since a file with the same name may be created
-        # in the small window between checking above and opening here. It is
-        # better to fail with an error than to overwrite an existing file.
-        with fpath.open('xb') as snapshot_file:
-            snapshot_file.write(snapshot.SNAPSHOT_VERSION_BYTE)
-            snapshot_file.write(snapshot.to_bytes())
         return fpath
@@ -1,8 +1,10 @@
+from concurrent.futures import Future
 import logging
 from typing import List
 from libmuscle.communicator import Communicator, Endpoint, Message
 from libmuscle.mpp_message import ClosePort, MPPMessage
 from libmuscle.port import Port
+from libmuscle.timestamp import Timestamp
 
 from ymmsl import Conduit, Identifier, Operator, Reference, Settings
 
@@ -152,14 +154,15 @@ def communicator3() -> Communicator:
 def test_create_communicator(communicator) -> None:
     assert str(communicator._kernel) == 'kernel'
     assert communicator._index == [13]
-    assert len(communicator._servers) == 1
+    assert len(communicator._servers) == 2
     assert communicator._clients == {}
     assert communicator._post_office._outboxes == {}
 
 
 def test_get_locations(communicator) -> None:
-    assert len(communicator.get_locations()) == 1
-    assert communicator.get_locations()[0].startswith('tcp:')
+    assert len(communicator.get_locations()) == 2
+    assert communicator.get_locations()[0].startswith('unix:')
+    assert communicator.get_locations()[1].startswith('tcp:')
 
 
 def test_connect() -> None:
@@ -291,6 +294,24 @@ def test_send_message(communicator, message) -> None:
     assert msg.data == b'test'
 
 
+def test_send_message_reuse_encoded(communicator) -> None:
+    message = Message(0.0, None, 'test', Settings())
+    with patch('libmuscle.communicator.MPPMessage.encode_data',
+               wraps=MPPMessage.encode_data) as encode_data:
+        communicator.send_message('out', message)
+        communicator.send_message('out', message)
+        assert encode_data.call_count == 1
+
+        communicator.send_message('out', Message(0.0, None, 'test2'))
+        assert encode_data.call_count == 2
+
+    outbox = communicator._post_office._outboxes['other.in[13]']
+    for i, data in enumerate(['test', 'test', 'test2']):
+        msg = MPPMessage.from_bytes(outbox._Outbox__queue.get())
+        assert msg.message_number == i
+        assert msg.data == data
+
+
 def test_send_on_disconnected_port(communicator, message) -> None:
     communicator._peer_manager.is_connected.return_value = False
     communicator.send_message('not_connected', message)
@@ -393,6 +414,21 @@ def test_close_port(communicator) -> None:
     assert isinstance(msg.data, ClosePort)
 
 
+def test_close_ports(communicator2) -> None:
+    communicator2.close_ports([('out', slot) for slot in range(3)])
+
+    outbox = communicator2._post_office._outboxes['kernel[13].in']
+    for slot in range(3):
+        msg = MPPMessage.from_bytes(outbox._Outbox__queue.get())
+        assert msg.sender == 'other.out[{}]'.format(slot)
+        assert msg.timestamp == float('inf')
+        assert isinstance(msg.data, ClosePort)
+
+    for slot in range(3):
+        assert communicator2.get_port('out').get_num_messages(slot) == 1
+    assert communicator2.get_port('out').get_num_messages(3) == 0
+
+
 def test_receive_message(communicator) -> None:
     client_mock = MagicMock()
     client_mock.receive.return_value = MPPMessage(
@@ -412,6 +448,60 @@ def test_receive_message(communicator) -> None:
     assert last_saved == 2.0
 
 
+def test_ireceive_message(communicator) -> None:
+    client_mock = MagicMock()
+    client_mock.receive.return_value = MPPMessage(
+            Reference('other.out[13]'), Reference('kernel[13].in'),
+            None, 0.0, None, Settings({'test1': 12}), 0, 2.0,
+            b'test').encoded()
+    get_client_mock = MagicMock(return_value=client_mock)
+    communicator._Communicator__get_client = get_client_mock
+    communicator._profiler = MagicMock()
+
+    pending = communicator.ireceive_message('in')
+    get_client_mock.assert_called_with(Reference('other'))
+    assert communicator.get_message_counts()['in'] == [0]
+
+    msg, last_saved = communicator.receive_message('in', pending=pending)
+
+    client_mock.receive.assert_called_once_with(Reference('kernel[13].in'))
+    assert msg.data == b'test'
+    assert msg.settings['test1'] == 12
+    assert last_saved == 2.0
+    assert communicator.get_message_counts()['in'] == [1]
+
+    # profiled receive time includes the transfer
+    profile_event = communicator._profiler.start.return_value
+    assert isinstance(profile_event.start_time, Timestamp)
+    assert communicator._receive_start_times == {}
+
+
+def test_cancel_receive(communicator) -> None:
+    client_mock = MagicMock()
+    client_mock.receive.return_value = MPPMessage(
+            Reference('other.out[13]'), Reference('kernel[13].in'),
+            None, 0.0, None, Settings(), 0, 2.0, ClosePort()).encoded()
+    communicator._Communicator__get_client = MagicMock(
+            return_value=client_mock)
+    communicator._profiler = MagicMock()
+
+    # not started yet, so the request is never sent
+    waiting = Future()      # type: Future[bytes]
+    communicator._receive_start_times[waiting] = 0.0
+    communicator.cancel_receive('in', None, waiting)
+    assert waiting.cancelled()
+    assert communicator._receive_start_times == {}
+
+    # already received, so the message is processed and discarded
+    pending = communicator.ireceive_message('in')
+    pending.result()
+    communicator.cancel_receive('in', None, pending)
+    assert pending.done()
+    assert not communicator.get_port('in').is_open()
+    assert communicator.get_message_counts()['in'] == [1]
+    assert communicator._receive_start_times == {}
+
+
 def test_receive_message_default(communicator) -> None:
     communicator._peer_manager.is_connected.return_value = False
     default_msg = Message(3.0, 4.0, 'test', Settings())
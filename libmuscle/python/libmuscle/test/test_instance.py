@@ -48,7 +48,8 @@ def instance(sys_argv_instance, tmp_path):
         comm_type.return_value = communicator
 
         mmp_client_object = MagicMock()
-        mmp_client_object.request_peers.return_value = (None, None, None)
+        mmp_client_object.register_and_connect.return_value = (
+                None, None, None, Settings())
         checkpoint_info = (0.0, Checkpoints(), None, tmp_path)
         mmp_client_object.get_checkpoint_info.return_value = checkpoint_info
         mmp_client.return_value = mmp_client_object
@@ -57,7 +58,7 @@ def instance(sys_argv_instance, tmp_path):
             Operator.F_INIT: ['in', 'not_connected'],
             Operator.O_F: ['out']})
         instance._f_init_cache = dict()
-        instance._f_init_cache[('in', None)] = msg
+        instance._f_init_cache['in'] = {None: msg}
         yield instance
 
 
@@ -66,7 +67,8 @@ def instance2(sys_argv_instance, tmp_path):
     with patch('libmuscle.instance.MMPClient') as mmp_client, \
          patch('libmuscle.instance.Communicator'):
         mmp_client_object = MagicMock()
-        mmp_client_object.request_peers.return_value = (None, None, None)
+        mmp_client_object.register_and_connect.return_value = (
+                None, None, None, Settings())
         checkpoint_info = (0.0, Checkpoints(), None, tmp_path)
         mmp_client_object.get_checkpoint_info.return_value = checkpoint_info
         mmp_client.return_value = mmp_client_object
@@ -81,7 +83,8 @@ def test_create_instance(
     with patch('libmuscle.instance.MMPClient') as mmp_client, \
          patch('libmuscle.instance.Communicator') as comm_type:
         mmp_client_object = MagicMock()
-        mmp_client_object.request_peers.return_value = (None, None, None)
+        mmp_client_object.register_and_connect.return_value = (
+                None, None, None, Settings())
         checkpoint_info = (0.0, Checkpoints(), None, tmp_path)
         mmp_client_object.get_checkpoint_info.return_value = checkpoint_info
         mmp_client.return_value = mmp_client_object
@@ -96,8 +99,7 @@ def test_create_instance(
         assert len(instance._settings_manager.base) == 0
         assert len(instance._settings_manager.overlay) == 0
         mmp_client.assert_called_once_with('localhost:9000')
-        assert mmp_client_object._register.called_with()
-        assert mmp_client_object._connect.called_with()
+        assert mmp_client_object.register_and_connect.called_with()
         comm_type.assert_called_with(Reference('test_instance'), [13, 42],
                                      ports, instance._profiler)
         assert instance._communicator == comm_type.return_value
@@ -152,10 +154,16 @@ def test_get_setting(instance):
 
 
 def test_list_ports(instance):
+    instance._communicator.list_ports.return_value = {
+            Operator.F_INIT: ['in'], Operator.O_F: ['out1', 'out2']}
     ports = instance.list_ports()
     assert instance._communicator.list_ports.called_with()
     assert ports == instance._communicator.list_ports.return_value
 
+    ports[Operator.O_F].append('out3')
+    assert instance._communicator.list_ports.return_value[Operator.O_F] == [
+            'out1', 'out2']
+
 
 def test_is_vector_port(instance):
     instance._communicator.get_port.return_value.is_vector = MagicMock(
@@ -173,13 +181,13 @@ def test_send(instance, message):
 
 
 def test_send_invalid_port(instance, message):
-    instance._communicator.port_exists.return_value = False
+    instance._communicator.get_port_or_none.return_value = None
     with pytest.raises(RuntimeError):
         instance.send('does_not_exist', message, 1)
 
 
 def test_receive(instance):
-    instance._communicator.get_port.return_value = MagicMock(
+    instance._communicator.get_port_or_none.return_value = MagicMock(
             operator=Operator.F_INIT)
     msg = instance.receive('in')
     assert msg.timestamp == 0.0
@@ -193,8 +201,7 @@ def test_receive(instance):
 
 
 def test_receive_default(instance):
-    instance._communicator.port_exists.return_value = True
-    port = instance._communicator.get_port.return_value
+    port = instance._communicator.get_port_or_none.return_value
     port.operator = Operator.F_INIT
     port.is_connected.return_value = False
     instance.receive('not_connected', 1, 'testing')
@@ -205,7 +212,7 @@ def test_receive_default(instance):
 
 
 def test_receive_invalid_port(instance):
-    instance._communicator.port_exists.return_value = False
+    instance._communicator.get_port_or_none.return_value = None
     with pytest.raises(RuntimeError):
         instance.receive('does_not_exist', 1)
 
@@ -251,7 +258,7 @@ def test_reuse_instance_receive_overlay(instance):
 
 
 def test_reuse_instance_closed_port(instance):
-    def receive_message(port_name, slot=None, default=None):
+    def receive_message(port_name, slot=None, default=None, pending=None):
         if port_name == 'muscle_settings_in':
             return Message(0.0, None, Settings(), Settings()), 0.0
         elif port_name == 'in':
@@ -276,10 +283,43 @@ def test_reuse_instance_closed_port(instance):
 
     do_reuse = instance.reuse_instance()
     assert do_reuse is False
+    # a single receive is done directly, without a background thread
+    instance._communicator.ireceive_message.assert_not_called()
+
+
+def test_reuse_instance_shutdown_order(instance):
+    def receive_message(port_name, slot=None, default=None, pending=None):
+        if port_name == 'muscle_settings_in':
+            return Message(0.0, None, Settings(), Settings()), 0.0
+        return Message(0.0, None, ClosePort(), Settings()), 1.0
+
+    port = MagicMock()
+    port.is_vector.return_value = False
+    port.is_connected.return_value = True
+
+    instance._communicator.receive_message = receive_message
+    instance._communicator.list_ports.return_value = {
+            Operator.F_INIT: ['in'], Operator.O_F: ['out']}
+    instance._communicator.get_port.return_value = port
+
+    calls = MagicMock()
+    instance._snapshot_manager.shutdown = calls.snapshot_shutdown
+    calls.snapshot_shutdown.side_effect = RuntimeError(
+            'Failed to write snapshot')
+    instance._Instance__close_ports = calls.close_ports
+    instance._deregister = calls.deregister
+
+    with pytest.raises(RuntimeError):
+        instance.reuse_instance()
+
+    # snapshots are written before peers see our ports closing, and we
+    # deregister even if that fails
+    assert [c[0] for c in calls.mock_calls] == [
+            'snapshot_shutdown', 'close_ports', 'deregister']
 
 
 def test_reuse_instance_vector_port(instance2):
-    def receive_message(port_name, slot=None, default=None):
+    def receive_message(port_name, slot=None, default=None, pending=None):
         if port_name == 'muscle_settings_in':
             return Message(0.0, None, Settings(), Settings()), 0.0
         elif port_name == 'in':
@@ -307,6 +347,39 @@ def test_reuse_instance_vector_port(instance2):
     assert msg.data == 'test 5'
 
 
+def test_reuse_instance_vector_port_receive_fails(instance2):
+    def receive_message(port_name, slot=None, default=None, pending=None):
+        if port_name == 'muscle_settings_in':
+            return Message(0.0, None, Settings(), Settings()), 0.0
+        elif port_name == 'in':
+            if slot == 3:
+                raise RuntimeError('Unexpected message number')
+            return Message(0.0, None, 'test', Settings()), 0.0
+        assert False    # pragma: no cover
+
+    instance2._communicator.receive_message = receive_message
+    instance2._communicator.list_ports.return_value = {
+            Operator.F_INIT: ['in'],
+            Operator.O_F: ['out']}
+
+    port = MagicMock()
+    port.is_vector.return_value = True
+    port.is_connected.return_value = True
+    port.is_resizable.return_value = False
+    port.get_length.return_value = 5
+    instance2._communicator.get_port.return_value = port
+
+    with pytest.raises(RuntimeError):
+        instance2.reuse_instance()
+
+    # the receives after the failed one are not left running
+    ireceive = instance2._communicator.ireceive_message
+    cancel = instance2._communicator.cancel_receive
+    assert ireceive.call_count == 5
+    assert cancel.call_count == 1
+    cancel.assert_called_with('in', 4, ireceive.return_value)
+
+
 def test_reuse_instance_no_f_init_ports(instance):
     instance._communicator.receive_message.return_value = Message(
             0.0, None, Settings(), Settings()), 0.0
@@ -334,7 +407,8 @@ def test_checkpoint_support(sys_argv_instance, tmp_path, flags, expectation):
         comm_type.return_value = MagicMock()
 
         mmp_client_object = MagicMock()
-        mmp_client_object.request_peers.return_value = (None, None, None)
+        mmp_client_object.register_and_connect.return_value = (
+                None, None, None, Settings())
         checkpoint_info = (0.0, Checkpoints(at_end=True), None, tmp_path)
         mmp_client_object.get_checkpoint_info.return_value = checkpoint_info
         mmp_client.return_value = mmp_client_object
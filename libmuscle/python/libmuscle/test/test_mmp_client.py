@@ -14,7 +14,14 @@ def test_init() -> None:
     with patch('libmuscle.mmp_client.TcpTransportClient') as mock_ttc:
         stub = mock_ttc.return_value
         client = MMPClient('')
-        assert client._transport_client == stub     # type: ignore
+        assert client._transport_clients[0] == stub     # type: ignore
+
+        client = MMPClient('', 3)
+        assert len(client._transport_clients) == 3      # type: ignore
+        assert mock_ttc.call_count == 5
+
+        with pytest.raises(RuntimeError):
+            MMPClient('', 0)
 
 
 def test_connection_fail() -> None:
@@ -90,6 +97,71 @@ def test_register_instance(mocked_mmp_client) -> None:
             libmuscle.__version__]
 
 
+def test_register_and_connect(mocked_mmp_client) -> None:
+    client, stub = mocked_mmp_client
+
+    result_msg = [
+            ResponseType.SUCCESS.value,
+            [['kernel.out', 'other.in']],
+            {'other': [20]},
+            {'other': ['direct:test', 'tcp:test']},
+            {'test1': 'test'}]
+    stub.call.return_value = msgpack.packb(result_msg, use_bin_type=True)
+
+    conduits, peer_dims, peer_locations, settings = (
+            client.register_and_connect(
+                Reference('kernel[13]'), ['tcp:test'],
+                [Port('out', Operator.O_I)]))
+
+    assert stub.call.call_count == 1
+    sent_msg = msgpack.unpackb(stub.call.call_args[0][0], raw=False)
+    assert sent_msg == [
+            RequestType.REGISTER_AND_CONNECT.value, 'kernel[13]',
+            ['tcp:test'], [['out', 'O_I']], libmuscle.__version__]
+
+    assert conduits == [Conduit('kernel.out', 'other.in')]
+    assert peer_dims[Reference('other')] == [20]
+    assert peer_locations[Reference('other')] == ['direct:test', 'tcp:test']
+    assert settings['test1'] == 'test'
+
+
+def test_register_and_connect_pending(mocked_mmp_client) -> None:
+    client, stub = mocked_mmp_client
+
+    results = [
+            [ResponseType.PENDING.value, 'Waiting for component other'],
+            [
+                ResponseType.SUCCESS.value, [['kernel.out', 'other.in']],
+                {'other': [20]}, {'other': ['tcp:test']}],
+            [ResponseType.SUCCESS.value, {'test1': 'test'}]]
+    stub.call.side_effect = [
+            msgpack.packb(result, use_bin_type=True) for result in results]
+
+    conduits, _, peer_locations, settings = client.register_and_connect(
+            Reference('kernel[13]'), ['tcp:test'], [])
+
+    sent_types = [
+            msgpack.unpackb(args[0][0], raw=False)[0]
+            for args in stub.call.call_args_list]
+    assert sent_types == [
+            RequestType.REGISTER_AND_CONNECT.value,
+            RequestType.GET_PEERS.value, RequestType.GET_SETTINGS.value]
+
+    assert conduits == [Conduit('kernel.out', 'other.in')]
+    assert peer_locations[Reference('other')] == ['tcp:test']
+    assert settings['test1'] == 'test'
+
+
+def test_register_and_connect_error(mocked_mmp_client) -> None:
+    client, stub = mocked_mmp_client
+
+    result_msg = [ResponseType.ERROR.value, 'test_error_message']
+    stub.call.return_value = msgpack.packb(result_msg, use_bin_type=True)
+
+    with pytest.raises(RuntimeError):
+        client.register_and_connect(Reference('kernel[13]'), [], [])
+
+
 def test_request_peers(mocked_mmp_client) -> None:
     client, stub = mocked_mmp_client
 
@@ -32,6 +32,18 @@ def test_create() -> None:
     assert msg.data == data
 
 
+def test_encode_with_encoded_data() -> None:
+    sender = Reference('sender.port')
+    receiver = Reference('receiver.port')
+    settings = Settings({'test': [1.0, 2.0]})
+
+    for data in (None, 'test', {'a': [1, 2.0]}, np.arange(6.0)):
+        msg = MPPMessage(
+                sender, receiver, 10, 1.0, None, settings, 3, 4.0, data)
+        encoded_data = MPPMessage.encode_data(data)
+        assert msg.encoded(encoded_data) == msg.encoded()
+
+
 def test_grid_encode() -> None:
     sender = Reference('sender.port')
     receiver = Reference('receiver.port')
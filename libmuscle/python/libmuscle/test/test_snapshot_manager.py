@@ -35,6 +35,7 @@ def test_save_load_snapshot(tmp_path: Path) -> None:
     snapshot_manager.save_snapshot(
             Message(0.2, None, 'test data'), False, ['test'], 13.0, None,
             Settings())
+    snapshot_manager.flush()
 
     communicator.get_message_counts.assert_called_with()
     manager.submit_snapshot_metadata.assert_called()
@@ -66,6 +67,7 @@ def test_save_load_snapshot(tmp_path: Path) -> None:
     snapshot_manager2.save_snapshot(
             Message(0.6, None, 'test data2'), True, ['test'], 42.2, 1.2,
             Settings())
+    snapshot_manager2.flush()
 
     instance, metadata = manager.submit_snapshot_metadata.call_args[0]
     assert instance == instance_id
@@ -103,6 +105,7 @@ def test_save_load_implicit_snapshot(tmp_path: Path) -> None:
     # save implicit snapshot
     snapshot_manager.save_snapshot(
             None, True, ['implicit'], 1.0, 1.5, Settings())
+    snapshot_manager.flush()
 
     manager.submit_snapshot_metadata.assert_called_once()
     instance, metadata = manager.submit_snapshot_metadata.call_args[0]
@@ -122,4 +125,23 @@ def test_save_load_implicit_snapshot(tmp_path: Path) -> None:
     assert not snapshot_manager2.resuming_from_final()
     snapshot_manager2.save_snapshot(
             None, True, ['implicit'], 12.3, 2.5, Settings())
+    snapshot_manager2.flush()
     manager.submit_snapshot_metadata.assert_called_once()
+
+
+def test_save_many_snapshots(tmp_path: Path) -> None:
+    manager = MagicMock()
+    communicator = MagicMock()
+    communicator.get_message_counts.return_value = {}
+    snapshot_manager = SnapshotManager(
+            Reference('test'), manager, communicator)
+
+    snapshot_manager.prepare_resume(None, tmp_path)
+    for i in range(5):
+        snapshot_manager.save_snapshot(
+                Message(i, None, 'test data'), False, ['test'], 1.0, None,
+                Settings())
+    snapshot_manager.shutdown()
+
+    assert manager.submit_snapshot_metadata.call_count == 5
+    assert len(list(tmp_path.glob('*.pack'))) == 5
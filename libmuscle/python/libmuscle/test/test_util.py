@@ -1,9 +1,11 @@
+import sys
 from typing import List
 
 import pytest
 from ymmsl import Reference
 
-from libmuscle.util import instance_indices, instance_to_kernel
+from libmuscle.util import (
+        instance_indices, instance_to_kernel, parse_muscle_args)
 
 
 @pytest.fixture
@@ -33,3 +35,19 @@ def test_instance_indices(instances: List[Reference]) -> None:
     assert instance_indices(instances[3]) == [3, 2]
     assert instance_indices(instances[4]) == [3]
     assert instance_indices(instances[5]) == [1, 2]
+
+
+def test_parse_muscle_args() -> None:
+    old_argv = sys.argv
+    sys.argv = [
+            '', '--muscle-instance=a[1]', '--muscle-log-file=x',
+            '--muscle-instance=b', '--other', '--muscle-log-file=y']
+    try:
+        args = parse_muscle_args()
+        assert args == {'instance': 'a[1]', 'log-file': 'y'}
+        assert parse_muscle_args() is args
+
+        sys.argv = ['', '--muscle-manager=localhost:9001']
+        assert parse_muscle_args() == {'manager': 'localhost:9001'}
+    finally:
+        sys.argv = old_argv
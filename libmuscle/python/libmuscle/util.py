@@ -1,7 +1,8 @@
 import itertools
 from pathlib import Path
+import re
 import sys
-from typing import Generator, List, Optional, cast
+from typing import Dict, Generator, List, Optional, Tuple, cast
 
 from ymmsl import Reference
 
@@ -52,6 +53,47 @@ def generate_indices(dims: List[int]) -> Generator[List[int], None, None]:
         yield list(index)
 
 
+_ARGV_RE = re.compile(
+        r'--muscle-(manager|log-file|instance)=(.*)', re.DOTALL)
+"""Matches the MUSCLE3 options we look for on the command line."""
+
+
+_argv_cache = None  # type: Optional[Tuple[Tuple[str, ...], Dict[str, str]]]
+
+
+def parse_muscle_args() -> Dict[str, str]:
+    """Returns the MUSCLE3 options given on the command line.
+
+    The result is cached, so that e.g. creating several Instances
+    doesn't scan the command line every time. If sys.argv changes, it
+    is scanned again.
+
+    Neither getopt, optparse, or argparse will let me pick out
+    just one option from the command line and ignore the rest.
+    So we do it by hand.
+
+    Returns:
+        A dictionary mapping option names without the --muscle-
+        prefix (e.g. 'manager') to the values given for them. For
+        --muscle-log-file= the last value given is used, for the
+        others the first one.
+    """
+    global _argv_cache
+    key = tuple(sys.argv)
+    if _argv_cache is None or _argv_cache[0] != key:
+        result = dict()     # type: Dict[str, str]
+        for arg in key[1:]:
+            match = _ARGV_RE.match(arg)
+            if match:
+                option, value = match.groups()
+                if option == 'log-file':
+                    result[option] = value
+                else:
+                    result.setdefault(option, value)
+        _argv_cache = key, result
+    return _argv_cache[1]
+
+
 def extract_log_file_location(filename: str) -> Optional[Path]:
     """Gets the log file location from the command line.
 
@@ -70,15 +112,7 @@ def extract_log_file_location(filename: str) -> Optional[Path]:
     Returns:
         Path to the log file to write.
     """
-    # Neither getopt, optparse, or argparse will let me pick out
-    # just one option from the command line and ignore the rest.
-    # So we do it by hand.
-    prefix = '--muscle-log-file='
-    given_path_str = None
-    for arg in sys.argv[1:]:
-        if arg.startswith(prefix):
-            given_path_str = arg[len(prefix):]
-
+    given_path_str = parse_muscle_args().get('log-file')
     if not given_path_str:
         return None
 